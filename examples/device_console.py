@@ -2,20 +2,74 @@
 設備控制台 - 交互式控制界面
 """
 
-import cmd
+import asyncio
+import inspect
+from prompt_toolkit import PromptSession
+from prompt_toolkit.patch_stdout import patch_stdout
 from quantum_light_controller import *
 
-class LightSourceConsole(cmd.Cmd):
-    """光源控制台"""
+class LightSourceConsole:
+    """光源控制台 (異步輸入，回調輸出不會被提示符阻塞)"""
     
     intro = "🎛️ 量子預火光源控制台 (輸入 help 查看命令)"
     prompt = "光源> "
     
     def __init__(self):
-        super().__init__()
         self.light_source = None
+        self._tasks = set()  # 仍在後台執行的異步命令
         self._initialize_system()
     
+    async def run(self):
+        """運行控制台主循環"""
+        session = PromptSession()
+        print(self.intro)
+        
+        with patch_stdout():
+            try:
+                while True:
+                    try:
+                        line = await session.prompt_async(self.prompt)
+                    except (EOFError, KeyboardInterrupt):
+                        break
+                    
+                    if await self.dispatch(line):
+                        break
+            finally:
+                await self._cancel_pending()
+    
+    async def dispatch(self, line: str) -> bool:
+        """執行一條命令，返回 True 表示退出"""
+        command, _, arg = line.strip().partition(" ")
+        if not command:
+            return False
+        
+        handler = getattr(self, f"do_{command}", None)
+        if handler is None:
+            print(f"❌ 未知命令: {command}")
+            return False
+        
+        result = handler(arg.strip())
+        if inspect.isawaitable(result):
+            # 異步命令在後台執行，提示符保持可用 (例如預熱期間仍可輸入 power_off)
+            task = asyncio.ensure_future(result)
+            self._tasks.add(task)
+            task.add_done_callback(self._on_task_done)
+            return False
+        return bool(result)
+    
+    def _on_task_done(self, task: asyncio.Task):
+        """後台命令結束"""
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"❌ 命令執行失敗: {task.exception()}")
+    
+    async def _cancel_pending(self):
+        """取消仍在執行的命令並等待其結束"""
+        pending = self._tasks - {asyncio.current_task()}
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    
     def _initialize_system(self):
         """初始化系統"""
         config = LightSourceConfig()
@@ -33,26 +87,38 @@ class LightSourceConsole(cmd.Cmd):
         """功率更新回調"""
         print(f"\n[系統] 功率更新: {power:.3e}W")
     
-    def do_power_on(self, arg):
+    def do_help(self, arg):
+        """查看幫助: help [命令]"""
+        if arg:
+            handler = getattr(self, f"do_{arg}", None)
+            print(handler.__doc__ if handler else f"❌ 未知命令: {arg}")
+            return
+        
+        for name in sorted(dir(self)):
+            if name.startswith("do_"):
+                print(f"  {getattr(self, name).__doc__.splitlines()[0]}")
+    
+    async def do_power_on(self, arg):
         """開啟光源: power_on"""
-        if self.light_source.power_on():
+        if await self.light_source.power_on():
             print("✅ 光源已開啟")
         else:
             print("❌ 開啟失敗")
     
-    def do_power_off(self, arg):
-        """關閉光源: power_off"""
-        self.light_source.power_off()
+    async def do_power_off(self, arg):
+        """關閉光源: power_off (同時取消仍在執行的命令)"""
+        await self._cancel_pending()
+        await self.light_source.power_off()
         print("✅ 光源已關閉")
     
-    def do_calibrate(self, arg):
+    async def do_calibrate(self, arg):
         """執行校準: calibrate"""
-        if self.light_source.calibrate():
+        if await self.light_source.calibrate():
             print("✅ 校準完成")
         else:
             print("❌ 校準失敗")
     
-    def do_start(self, arg):
+    async def do_start(self, arg):
         """開始發射: start <功率> <時長>
         示例: start 2.5e-9 5.0"""
         try:
@@ -66,7 +132,7 @@ class LightSourceConsole(cmd.Cmd):
             
             params = EmissionParameters(power=power, duration=duration)
             
-            if self.light_source.start_emission(params):
+            if await self.light_source.start_emission(params):
                 print(f"✅ 開始發射: {power:.3e}W, {duration}秒")
             else:
                 print("❌ 發射失敗")
@@ -74,9 +140,9 @@ class LightSourceConsole(cmd.Cmd):
         except ValueError:
             print("❌ 參數格式錯誤")
     
-    def do_stop(self, arg):
+    async def do_stop(self, arg):
         """停止發射: stop"""
-        self.light_source.stop_emission()
+        await self.light_source.stop_emission()
         print("✅ 發射已停止")
     
     def do_set_power(self, arg):
@@ -105,9 +171,9 @@ class LightSourceConsole(cmd.Cmd):
             print(f"  {subsystem}: {substatus}")
     
     def do_exit(self, arg):
-        """退出控制台: exit"""
+        """退出控制台: exit (取消仍在執行的命令)"""
         print("👋 再見!")
         return True
 
 if __name__ == "__main__":
-    LightSourceConsole().cmdloop()
+    asyncio.run(LightSourceConsole().run())
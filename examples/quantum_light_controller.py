@@ -5,29 +5,58 @@
 
 import time
 import json
-import threading
-from typing import Dict, List, Optional, Callable, Any
-from enum import Enum
+import asyncio
+from collections import deque
+from typing import Dict, List, Optional, Callable, Any, NamedTuple, Union
+from enum import Enum, IntEnum
 from dataclasses import dataclass
 import logging
 
 # 配置日誌
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-class LightSourceState(Enum):
-    """光源狀態"""
+# 回調事件隊列容量 (超出時丟棄最舊事件)
+CALLBACK_QUEUE_SIZE = 4096
+
+# 預熱序列: (功率比例, 持續秒數)
+WARMUP_STEPS = (
+    (0.1, 2),   # 10% 功率, 2秒
+    (0.3, 3),   # 30% 功率, 3秒
+    (0.6, 3),   # 60% 功率, 3秒
+    (0.8, 2),   # 80% 功率, 2秒
+)
+
+class LightSourceState(str, Enum):
+    """光源狀態 (成員本身即字符串)"""
     OFF = "off"
     STANDBY = "standby" 
     CALIBRATING = "calibrating"
     READY = "ready"
     EMITTING = "emitting"
     ERROR = "error"
+    
+    __str__ = str.__str__
 
-class OutputMode(Enum):
-    """輸出模式"""
+class OutputMode(str, Enum):
+    """輸出模式 (成員本身即字符串)"""
     CONTINUOUS = "continuous"
     PULSED = "pulsed"
     BURST = "burst"
+    
+    __str__ = str.__str__
+
+class EventKind(IntEnum):
+    """回調事件類型 (兼作回調列表索引)"""
+    STATE_CHANGE = 0
+    POWER_UPDATE = 1
+    ERROR = 2
+
+# 舊版字符串事件名 (僅在註冊回調時轉換)
+_EVENT_NAMES = {
+    'state_change': EventKind.STATE_CHANGE,
+    'power_update': EventKind.POWER_UPDATE,
+    'error': EventKind.ERROR
+}
 
 @dataclass
 class LightSourceConfig:
@@ -38,18 +67,36 @@ class LightSourceConfig:
     warmup_time: float = 30.0       # 預熱時間 30秒
     calibration_interval: int = 3600 # 校準間隔 1小時
 
-@dataclass  
+@dataclass(frozen=True)
 class EmissionParameters:
-    """發射參數"""
+    """發射參數 (不可變，構造時驗證後不會再被修改)"""
     power: float                    # 輸出功率
     duration: float = 0.0           # 發射時長 (0=持續)
     frequency: float = 0.0          # 脈衝頻率
     duty_cycle: float = 1.0         # 佔空比
     mode: OutputMode = OutputMode.CONTINUOUS
+    
+    def __post_init__(self):
+        """構造時一次性驗證與設備無關的參數"""
+        if (self.power <= 0 or self.duration < 0 or self.frequency < 0
+                or not 0 < self.duty_cycle <= 1):
+            raise ValueError(self._diagnose())
+    
+    def _diagnose(self) -> str:
+        """生成驗證失敗原因"""
+        if self.power <= 0:
+            return f"無效功率: {self.power}"
+        if self.duration < 0:
+            return "時長不能為負"
+        if self.frequency < 0:
+            return "頻率不能為負"
+        return "佔空比必須在0-1之間"
 
 class QuantumJetSubsystem:
     """量子噴流子系統 (仿真版本)"""
     
+    __slots__ = ('status', 'capsule_count', 'uniformity')
+    
     def __init__(self):
         self.status = "initialized"
         self.capsule_count = 0
@@ -79,7 +126,7 @@ class QuantumJetSubsystem:
         
     def configure_emission(self, params: EmissionParameters):
         """配置發射參數"""
-        logging.info(f"⚙️ 配置噴流發射參數: 功率={params.power:.3e}W, 模式={params.mode.value}")
+        logging.info("⚙️ 配置噴流發射參數: 功率=%.3eW, 模式=%s", params.power, params.mode)
         
     def get_status(self) -> Dict:
         """獲取狀態"""
@@ -92,6 +139,8 @@ class QuantumJetSubsystem:
 class ShenquOptimizerSubsystem:
     """神曲優化子系統 (仿真版本)"""
     
+    __slots__ = ('optimization_active', 'current_power', 'stability')
+    
     def __init__(self):
         self.optimization_active = False
         self.current_power = 0.0
@@ -127,17 +176,17 @@ class ShenquOptimizerSubsystem:
         
     def adjust_power(self, power: float) -> bool:
         """調整功率"""
-        logging.info(f"📊 調整功率: {self.current_power:.3e}W → {power:.3e}W")
+        logging.info("📊 調整功率: %.3eW → %.3eW", self.current_power, power)
         self.current_power = power
         return True
         
     def prepare_for_power(self, power: float):
         """準備功率輸出"""
-        logging.info(f"🔧 準備功率輸出: {power:.3e}W")
+        logging.info("🔧 準備功率輸出: %.3eW", power)
         
     def configure_optimization(self, params: EmissionParameters):
         """配置優化參數"""
-        logging.info(f"⚙️ 配置優化參數: 頻率={params.frequency}Hz, 佔空比={params.duty_cycle}")
+        logging.info("⚙️ 配置優化參數: 頻率=%sHz, 佔空比=%s", params.frequency, params.duty_cycle)
         
     def get_status(self) -> Dict:
         """獲取狀態"""
@@ -147,16 +196,25 @@ class ShenquOptimizerSubsystem:
             "stability": self.stability
         }
 
+class MetricsRecord(NamedTuple):
+    """性能指標快照 (不可變，可直接共享)"""
+    stability: float                # 穩定性
+    efficiency: float               # 量子效率
+    temperature: float              # 溫度 (°C)
+
 class PerformanceMonitor:
     """性能監控子系統 (仿真版本)"""
     
+    __slots__ = ('monitoring_active', 'metrics')
+    
     def __init__(self):
         self.monitoring_active = False
-        self.metrics = {
-            "stability": 0.99,
-            "efficiency": 1.35,
-            "temperature": 25.0
-        }
+        # 更新時用 self.metrics._replace(...) 整體替換
+        self.metrics = MetricsRecord(
+            stability=0.99,
+            efficiency=1.35,
+            temperature=25.0
+        )
         
     def calibrate_sensors(self):
         """校準傳感器"""
@@ -174,13 +232,13 @@ class PerformanceMonitor:
         logging.info("⏹️ 停止功率監控")
         self.monitoring_active = False
         
-    def get_current_metrics(self) -> Dict:
+    def get_current_metrics(self) -> MetricsRecord:
         """獲取當前指標"""
-        return self.metrics.copy()
+        return self.metrics
         
     def configure_monitoring(self, params: EmissionParameters):
         """配置監控參數"""
-        logging.info(f"⚙️ 配置監控參數: 時長={params.duration}s")
+        logging.info("⚙️ 配置監控參數: 時長=%ss", params.duration)
         
     def get_status(self) -> Dict:
         """獲取狀態"""
@@ -195,58 +253,97 @@ class QuantumLightSourceController:
     完整的光源控制實現
     """
     
+    __slots__ = (
+        'config', 'state', 'current_power', 'operating_time', '_dispatched_power',
+        'quantum_jet', 'optimizer', 'monitor',
+        '_stop_handle', '_warmup_task',
+        '_callbacks', '_event_queue', '_dispatch_scheduled',
+        '_status_template', '_subsystem_status'
+    )
+    
     def __init__(self, config: LightSourceConfig):
         self.config = config
         self.state = LightSourceState.OFF
         self.current_power = 0.0
         self.operating_time = 0.0
+        self._dispatched_power = 0.0  # 最近一次實際下發給優化器的功率
         
         # 初始化子系統
         self.quantum_jet = QuantumJetSubsystem()
         self.optimizer = ShenquOptimizerSubsystem() 
         self.monitor = PerformanceMonitor()
         
+        # 自動停止定時器 (由事件循環調度)
+        self._stop_handle: Optional[asyncio.TimerHandle] = None
+        self._warmup_task: Optional[asyncio.Task] = None
+        
         # 回調系統
-        self._callbacks = {
-            'state_change': [],
-            'power_update': [],
-            'error': []
+        self._callbacks = tuple([] for _ in EventKind)
+        self._event_queue = deque(maxlen=CALLBACK_QUEUE_SIZE)
+        self._dispatch_scheduled = False
+        
+        # 狀態快照模板 (get_status 原地更新後返回)
+        self._subsystem_status = dict.fromkeys(('quantum_jet', 'optimizer', 'monitor'))
+        self._status_template = {
+            'state': None,
+            'current_power': 0.0,
+            'operating_time': 0.0,
+            'wavelength': config.wavelength,
+            'performance_metrics': None,
+            'subsystem_status': self._subsystem_status
         }
         
-        logging.info(f"🎛️ 量子光源控制器初始化 - 波長: {config.wavelength*1e9:.1f}nm")
+        logging.info("🎛️ 量子光源控制器初始化 - 波長: %.1fnm", config.wavelength*1e9)
     
-    def power_on(self) -> bool:
+    async def power_on(self) -> bool:
         """開啟光源"""
-        if self.state != LightSourceState.OFF:
+        if self.state != LightSourceState.OFF or self._warmup_task is not None:
             logging.warning("⚠️ 光源已經開啟")
             return False
-            
+        
+        logging.info("🔌 啟動光源系統...")
+        # 子系統啟動和預熱整體作為一個任務 (可被 power_off / cancel_warmup 中止)
+        sequence = self._warmup_task = asyncio.create_task(self._power_on_sequence())
         try:
-            logging.info("🔌 啟動光源系統...")
-            self._update_state(LightSourceState.STANDBY)
-            
-            # 啟動子系統
-            self.quantum_jet.initialize()
-            self.optimizer.warm_up()
-            
-            # 執行預熱
-            self._execute_warmup_sequence()
-            
-            self._update_state(LightSourceState.READY)
-            logging.info("✅ 光源啟動完成，準備就緒")
+            await asyncio.shield(sequence)
             return True
             
+        except asyncio.CancelledError:
+            if not sequence.cancelled():
+                # power_on 本身被取消: 中止開機流程並等其清理完畢
+                sequence.cancel()
+                await asyncio.gather(sequence, return_exceptions=True)
+                raise
+            return False
+            
         except Exception as e:
-            logging.error(f"❌ 光源啟動失敗: {e}")
+            logging.error("❌ 光源啟動失敗: %s", e)
             self._update_state(LightSourceState.ERROR)
             return False
+            
+        finally:
+            if self._warmup_task is sequence:
+                self._warmup_task = None
     
-    def power_off(self):
+    async def power_off(self):
         """關閉光源"""
+        if self.state == LightSourceState.OFF and self._warmup_task is None:
+            logging.info("光源已處於關閉狀態")
+            return
+        
         logging.info("🔌 關閉光源系統...")
         
+        # 開機進行中: 中止開機流程並等待其關閉已啟動的子系統、回到 OFF
+        sequence = self._warmup_task
+        if sequence is not None and not sequence.done():
+            sequence.cancel()
+            await asyncio.gather(sequence, return_exceptions=True)
+            if sequence.cancelled():
+                logging.info("✅ 光源已安全關閉")
+                return
+        
         # 安全關閉序列
-        self.stop_emission()
+        await self.stop_emission()
         self.optimizer.shutdown()
         self.quantum_jet.shutdown()
         
@@ -254,7 +351,7 @@ class QuantumLightSourceController:
         self.current_power = 0.0
         logging.info("✅ 光源已安全關閉")
     
-    def start_emission(self, params: EmissionParameters) -> bool:
+    async def start_emission(self, params: EmissionParameters) -> bool:
         """開始光發射"""
         if self.state != LightSourceState.READY:
             logging.error("❌ 光源未就緒，無法發射")
@@ -270,25 +367,34 @@ class QuantumLightSourceController:
             self.optimizer.start_real_time_optimization()
             
             self._update_state(LightSourceState.EMITTING)
-            self.current_power = params.power
+            self.current_power = self._dispatched_power = params.power
             
-            logging.info(f"🚀 開始光發射 - 功率: {params.power:.3e}W, 時長: {params.duration}s")
+            logging.info("🚀 開始光發射 - 功率: %.3eW, 時長: %ss", params.power, params.duration)
             
             # 啟動監控
             self.monitor.start_power_monitoring()
             
-            # 如果設置了時長，自動停止
+            # 如果設置了時長，由事件循環定時自動停止
             if params.duration > 0:
-                threading.Timer(params.duration, self.stop_emission).start()
+                loop = asyncio.get_running_loop()
+                self._stop_handle = loop.call_later(params.duration, self._auto_stop)
             
             return True
             
         except Exception as e:
-            logging.error(f"❌ 啟動光發射失敗: {e}")
+            logging.error("❌ 啟動光發射失敗: %s", e)
             return False
     
-    def stop_emission(self):
+    async def stop_emission(self):
         """停止光發射"""
+        if self._stop_handle is not None:
+            self._stop_handle.cancel()
+            self._stop_handle = None
+        
+        self._stop_emission_now()
+    
+    def _stop_emission_now(self):
+        """執行停止序列 (不涉及等待，可直接在定時器回調中調用)"""
         if self.state == LightSourceState.EMITTING:
             logging.info("⏹️ 停止光發射...")
             
@@ -303,26 +409,32 @@ class QuantumLightSourceController:
     def set_power(self, power: float) -> bool:
         """設置輸出功率"""
         if power < 0 or power > self.config.max_power:
-            logging.error(f"❌ 功率超出範圍: {power:.3e}W")
+            logging.error("❌ 功率超出範圍: %.3eW", power)
             return False
         
         if self.state != LightSourceState.EMITTING:
             logging.error("❌ 光源未在發射狀態")
             return False
         
+        # 相對上次下發功率的變化量在穩定性容差內時無需經過優化器
+        # (不與 current_power 比較，否則小步連續調整會累積偏離而永遠不下發)
+        if abs(power - self._dispatched_power) <= self.config.stability_target * self.config.max_power:
+            self.current_power = power
+            return True
+        
         try:
             success = self.optimizer.adjust_power(power)
             if success:
-                self.current_power = power
-                self._trigger_callbacks('power_update', power)
-                logging.info(f"✅ 功率調整完成: {power:.3e}W")
+                self.current_power = self._dispatched_power = power
+                self._trigger_callbacks(EventKind.POWER_UPDATE, power)
+                logging.info("✅ 功率調整完成: %.3eW", power)
             return success
             
         except Exception as e:
-            logging.error(f"❌ 功率調整失敗: {e}")
+            logging.error("❌ 功率調整失敗: %s", e)
             return False
     
-    def calibrate(self) -> bool:
+    async def calibrate(self) -> bool:
         """執行系統校準"""
         logging.info("🎯 開始系統校準...")
         self._update_state(LightSourceState.CALIBRATING)
@@ -330,9 +442,9 @@ class QuantumLightSourceController:
         try:
             # 執行校準序列
             calibration_results = {
-                'quantum_jet': self.quantum_jet.calibrate(),
-                'optimizer': self.optimizer.calibrate(),
-                'sensors': self.monitor.calibrate_sensors()
+                'quantum_jet': await asyncio.to_thread(self.quantum_jet.calibrate),
+                'optimizer': await asyncio.to_thread(self.optimizer.calibrate),
+                'sensors': await asyncio.to_thread(self.monitor.calibrate_sensors)
             }
             
             if all(calibration_results.values()):
@@ -345,59 +457,90 @@ class QuantumLightSourceController:
                 return False
                 
         except Exception as e:
-            logging.error(f"❌ 校準過程出錯: {e}")
+            logging.error("❌ 校準過程出錯: %s", e)
             self._update_state(LightSourceState.ERROR)
             return False
     
     def get_status(self) -> Dict:
-        """獲取系統狀態"""
-        return {
-            'state': self.state.value,
-            'current_power': self.current_power,
-            'operating_time': self.operating_time,
-            'wavelength': self.config.wavelength,
-            'performance_metrics': self.monitor.get_current_metrics(),
-            'subsystem_status': {
-                'quantum_jet': self.quantum_jet.get_status(),
-                'optimizer': self.optimizer.get_status(),
-                'monitor': self.monitor.get_status()
-            }
-        }
+        """
+        獲取系統狀態
+        返回的字典在每次調用時原地更新，需要保留時請自行複製
+        """
+        status = self._status_template
+        status['state'] = self.state
+        status['current_power'] = self.current_power
+        status['operating_time'] = self.operating_time
+        status['wavelength'] = self.config.wavelength
+        status['performance_metrics'] = self.monitor.get_current_metrics()
+        
+        subsystem_status = self._subsystem_status
+        subsystem_status['quantum_jet'] = self.quantum_jet.get_status()
+        subsystem_status['optimizer'] = self.optimizer.get_status()
+        subsystem_status['monitor'] = self.monitor.get_status()
+        return status
+    
+    def cancel_warmup(self):
+        """中止正在進行的開機預熱序列 (光源回到 OFF 狀態)"""
+        if self._warmup_task is not None:
+            self._warmup_task.cancel()
+    
+    def register_callback(self, event: Union[EventKind, str], callback: Callable):
+        """註冊回調函數 (兼容字符串事件名)"""
+        if isinstance(event, str):
+            event = _EVENT_NAMES.get(event)
+            if event is None:
+                return
+        self._callbacks[event].append(callback)
+    
+    def _auto_stop(self):
+        """定時器到期後停止發射"""
+        self._stop_handle = None
+        self._stop_emission_now()
     
-    def register_callback(self, event: str, callback: Callable):
-        """註冊回調函數"""
-        if event in self._callbacks:
-            self._callbacks[event].append(callback)
+    async def _power_on_sequence(self):
+        """啟動子系統並預熱，被中止時關閉已啟動的子系統並回到 OFF"""
+        self._update_state(LightSourceState.STANDBY)
+        try:
+            # 阻塞調用交給線程池，不佔用事件循環
+            await self._run_blocking(self.quantum_jet.initialize)
+            await self._run_blocking(self.optimizer.warm_up)
+            await self._execute_warmup_sequence()
+        except asyncio.CancelledError:
+            logging.warning("⚠️ 光源啟動已中止")
+            self.optimizer.shutdown()
+            self.quantum_jet.shutdown()
+            self._update_state(LightSourceState.OFF)
+            raise
+        finally:
+            if self._warmup_task is asyncio.current_task():
+                self._warmup_task = None
+        
+        self._update_state(LightSourceState.READY)
+        logging.info("✅ 光源啟動完成，準備就緒")
+    
+    @staticmethod
+    async def _run_blocking(func: Callable):
+        """在線程中執行阻塞調用，被取消時等調用結束後再傳播，避免與隨後的關閉並發"""
+        call = asyncio.ensure_future(asyncio.to_thread(func))
+        try:
+            return await asyncio.shield(call)
+        except asyncio.CancelledError:
+            await call
+            raise
     
-    def _execute_warmup_sequence(self):
+    async def _execute_warmup_sequence(self):
         """執行預熱序列"""
         logging.info("🔥 執行預熱序列...")
         
-        warmup_steps = [
-            (0.1, 2),   # 10% 功率, 2秒
-            (0.3, 3),   # 30% 功率, 3秒  
-            (0.6, 3),   # 60% 功率, 3秒
-            (0.8, 2),   # 80% 功率, 2秒
-        ]
-        
-        for power_ratio, duration in warmup_steps:
+        for power_ratio, duration in WARMUP_STEPS:
             target_power = self.config.max_power * power_ratio
             self.optimizer.prepare_for_power(target_power)
-            time.sleep(duration)
+            await asyncio.sleep(duration)
     
     def _validate_emission_parameters(self, params: EmissionParameters):
-        """驗證發射參數"""
-        if params.power <= 0 or params.power > self.config.max_power:
+        """驗證發射參數 (其餘檢查已在 EmissionParameters 構造時完成)"""
+        if params.power > self.config.max_power:
             raise ValueError(f"無效功率: {params.power}")
-        
-        if params.duration < 0:
-            raise ValueError("時長不能為負")
-        
-        if params.frequency < 0:
-            raise ValueError("頻率不能為負")
-        
-        if params.duty_cycle <= 0 or params.duty_cycle > 1:
-            raise ValueError("佔空比必須在0-1之間")
     
     def _apply_emission_parameters(self, params: EmissionParameters):
         """應用發射參數"""
@@ -410,19 +553,45 @@ class QuantumLightSourceController:
         old_state = self.state
         self.state = new_state
         
-        self._trigger_callbacks('state_change', {
-            'old_state': old_state.value,
-            'new_state': new_state.value,
+        # 無訂閱者時不構造事件數據
+        if not self._callbacks[EventKind.STATE_CHANGE]:
+            return
+        
+        self._trigger_callbacks(EventKind.STATE_CHANGE, {
+            'old_state': old_state,
+            'new_state': new_state,
             'timestamp': time.time()
         })
     
-    def _trigger_callbacks(self, event: str, data):
-        """觸發回調"""
-        for callback in self._callbacks.get(event, []):
-            try:
-                callback(data)
-            except Exception as e:
-                logging.error(f"回調執行失敗: {e}")
+    def _trigger_callbacks(self, event: EventKind, data):
+        """觸發回調 (事件入隊，由事件循環統一派發)"""
+        if not self._callbacks[event]:
+            return
+        
+        self._event_queue.append((event, data))
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # 不在事件循環中調用時就地派發
+            self._dispatch_callbacks()
+            return
+        
+        if not self._dispatch_scheduled:
+            self._dispatch_scheduled = True
+            loop.call_soon(self._dispatch_callbacks)
+    
+    def _dispatch_callbacks(self):
+        """派發隊列中的所有回調事件"""
+        self._dispatch_scheduled = False
+        queue = self._event_queue
+        while queue:
+            event, data = queue.popleft()
+            for callback in self._callbacks[event]:
+                try:
+                    callback(data)
+                except Exception as e:
+                    logging.error("回調執行失敗: %s", e)
 
 # 設備適配器 (簡化版本)
 class DeviceAdapter:
@@ -446,7 +615,7 @@ class EthernetAdapter(DeviceAdapter):
         self.connected = False
         
     def connect(self) -> bool:
-        logging.info(f"🔗 連接以太網設備: {self.host}:{self.port}")
+        logging.info("🔗 連接以太網設備: %s:%s", self.host, self.port)
         self.connected = True
         return True
         
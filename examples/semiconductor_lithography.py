@@ -14,6 +14,9 @@ from src.core.light_source_controller import (
 )
 from src.adapters.device_adapters import DeviceManager, EthernetAdapter
 
+# 設備連接結果提示 (按連接成功與否索引)
+_CONN_STATUS = ("❌ {}: 連接失敗", "✅ {}: 連接成功")
+
 class SemiconductorLithographySystem:
     """
     半導體光刻系統集成
@@ -93,8 +96,7 @@ class SemiconductorLithographySystem:
         
         # 檢查連接結果
         for device_id, connected in connection_results.items():
-            status = "✅" if connected else "❌"
-            print(f"{status} {device_id}: {'連接成功' if connected else '連接失敗'}")
+            print(_CONN_STATUS[connected].format(device_id))
         
         return all(connection_results.values())
     
@@ -209,6 +211,11 @@ class SemiconductorLithographySystem:
         
         self.production_state = "EMERGENCY"
     
+    def shutdown(self):
+        """關閉光源並釋放設備連接"""
+        self.light_source.power_off()
+        self.device_manager.close()
+    
     def get_production_status(self) -> Dict:
         """獲取生產狀態"""
         light_source_status = self.light_source.get_status()
@@ -318,48 +325,50 @@ def demo_semiconductor_lithography():
     # 創建光刻系統
     litho_system = SemiconductorLithographySystem()
     
-    # 初始化系統
-    if not litho_system.initialize_system():
-        print("❌ 系統初始化失敗，演示中止")
-        return
-    
-    # 加載光刻配方
-    advanced_recipe = {
-        "name": "5nm EUV 工藝",
-        "exposure_time": 8.0,
-        "light_source": {
-            "power": 3.5e-9,    # 3.5nW
-            "frequency": 2000,  # 2kHz 脈衝
-            "duty_cycle": 0.6   # 60% 佔空比
+    try:
+        # 初始化系統
+        if not litho_system.initialize_system():
+            print("❌ 系統初始化失敗，演示中止")
+            return
+        
+        # 加載光刻配方
+        advanced_recipe = {
+            "name": "5nm EUV 工藝",
+            "exposure_time": 8.0,
+            "light_source": {
+                "power": 3.5e-9,    # 3.5nW
+                "frequency": 2000,  # 2kHz 脈衝
+                "duty_cycle": 0.6   # 60% 佔空比
+            }
         }
-    }
-    
-    if not litho_system.load_recipe(advanced_recipe):
-        print("❌ 配方加載失敗")
-        return
-    
-    # 創建測試晶圓列表
-    test_wafers = [f"Wafer_{i:03d}" for i in range(1, 4)]
-    
-    # 執行批量處理
-    results = litho_system.batch_process(test_wafers)
-    
-    # 顯示生產報告
-    print("\n" + "=" * 60)
-    print("📊 生產報告")
-    print("=" * 60)
-    print(f"總處理: {results['total']} 晶圓")
-    print(f"成功: {results['success']}")
-    print(f"失敗: {results['failed']}")
-    
-    # 顯示系統狀態
-    status = litho_system.get_production_status()
-    print(f"\n🔧 系統狀態: {status['production_state']}")
-    print(f"📦 已處理晶圓: {status['wafer_count']}")
-    
-    # 安全關閉系統
-    litho_system.light_source.power_off()
-    print("\n✅ 演示完成")
+        
+        if not litho_system.load_recipe(advanced_recipe):
+            print("❌ 配方加載失敗")
+            return
+        
+        # 創建測試晶圓列表
+        test_wafers = [f"Wafer_{i:03d}" for i in range(1, 4)]
+        
+        # 執行批量處理
+        results = litho_system.batch_process(test_wafers)
+        
+        # 顯示生產報告
+        print("\n" + "=" * 60)
+        print("📊 生產報告")
+        print("=" * 60)
+        print(f"總處理: {results['total']} 晶圓")
+        print(f"成功: {results['success']}")
+        print(f"失敗: {results['failed']}")
+        
+        # 顯示系統狀態
+        status = litho_system.get_production_status()
+        print(f"\n🔧 系統狀態: {status['production_state']}")
+        print(f"📦 已處理晶圓: {status['wafer_count']}")
+        
+        print("\n✅ 演示完成")
+    finally:
+        # 安全關閉系統 (初始化失敗時同樣釋放設備連接)
+        litho_system.shutdown()
 
 if __name__ == "__main__":
     demo_semiconductor_lithography()
@@ -4,10 +4,16 @@
 """
 
 import time
-import threading
+import asyncio
 from typing import Dict, List
 from quantum_light_controller import *
 
+# 曝光進度報告點 (佔曝光時長的比例)
+EXPOSURE_CHECKPOINTS = (0.2, 0.4, 0.6, 0.8, 1.0)
+
+# 設備連接結果提示 (按連接成功與否索引)
+_CONN_STATUS = ("❌ {}: 連接失敗", "✅ {}: 連接成功")
+
 class SemiconductorLithographySystem:
     """
     半導體光刻系統
@@ -32,6 +38,7 @@ class SemiconductorLithographySystem:
         # 生產狀態
         self.production_state = "IDLE"
         self.current_recipe = None
+        self._exposure_params = None
         self.wafer_count = 0
         
         # 設置回調
@@ -43,7 +50,7 @@ class SemiconductorLithographySystem:
         self.light_source.register_callback('power_update', self._on_power_update)
         self.light_source.register_callback('error', self._on_error)
     
-    def initialize_system(self) -> bool:
+    async def initialize_system(self) -> bool:
         """初始化系統"""
         print("🔄 初始化半導體光刻系統...")
         
@@ -53,11 +60,11 @@ class SemiconductorLithographySystem:
                 return False
             
             # 2. 啟動光源
-            if not self.light_source.power_on():
+            if not await self.light_source.power_on():
                 return False
             
             # 3. 系統校準
-            if not self.light_source.calibrate():
+            if not await self.light_source.calibrate():
                 return False
             
             print("✅ 光刻系統初始化完成")
@@ -84,8 +91,7 @@ class SemiconductorLithographySystem:
         results = self.device_manager.connect_all()
         
         for device_id, connected in results.items():
-            status = "✅" if connected else "❌"
-            print(f"{status} {device_id}: {'連接成功' if connected else '連接失敗'}")
+            print(_CONN_STATUS[connected].format(device_id))
         
         return all(results.values())
     
@@ -96,11 +102,18 @@ class SemiconductorLithographySystem:
         if not self._validate_recipe(recipe):
             return False
         
+        # 配方在整個批次內不變，發射參數只構造 (並驗證) 一次
+        try:
+            self._exposure_params = self._build_exposure_parameters(recipe)
+        except ValueError as e:
+            print(f"❌ 配方光源參數無效: {e}")
+            return False
+        
         self.current_recipe = recipe
         print("✅ 配方加載完成")
         return True
     
-    def start_exposure(self, wafer_id: str) -> bool:
+    async def start_exposure(self, wafer_id: str) -> bool:
         """開始晶圓曝光"""
         if self.production_state != "READY":
             print("❌ 系統未就緒")
@@ -115,19 +128,19 @@ class SemiconductorLithographySystem:
         
         try:
             # 1. 移動晶圓
-            self._move_wafer_to_position(wafer_id)
+            await asyncio.to_thread(self._move_wafer_to_position, wafer_id)
             
             # 2. 啟動光源
             exposure_params = self._get_exposure_parameters()
-            if not self.light_source.start_emission(exposure_params):
+            if not await self.light_source.start_emission(exposure_params):
                 return False
             
             # 3. 執行曝光
-            self._execute_exposure_sequence()
+            await self._execute_exposure_sequence()
             
             # 4. 完成曝光
-            self.light_source.stop_emission()
-            self._move_wafer_to_unload()
+            await self.light_source.stop_emission()
+            await asyncio.to_thread(self._move_wafer_to_unload)
             
             self.wafer_count += 1
             self.production_state = "READY"
@@ -140,7 +153,7 @@ class SemiconductorLithographySystem:
             self.production_state = "ERROR"
             return False
     
-    def batch_process(self, wafer_list: List[str]) -> Dict:
+    async def batch_process(self, wafer_list: List[str]) -> Dict:
         """批量處理"""
         print(f"🏭 批量處理 {len(wafer_list)} 個晶圓")
         
@@ -155,7 +168,7 @@ class SemiconductorLithographySystem:
             print(f"\n--- 進度: {i}/{len(wafer_list)} ---")
             
             start_time = time.time()
-            success = self.start_exposure(wafer_id)
+            success = await self.start_exposure(wafer_id)
             process_time = time.time() - start_time
             
             result = {
@@ -174,10 +187,11 @@ class SemiconductorLithographySystem:
         print(f"\n🎉 批量完成: {results['success']} 成功, {results['failed']} 失敗")
         return results
     
-    def emergency_stop(self):
+    async def emergency_stop(self):
         """緊急停止"""
         print("🛑 緊急停止!")
-        self.light_source.stop_emission()
+        self.light_source.cancel_warmup()
+        await self.light_source.stop_emission()
         self.production_state = "EMERGENCY"
     
     def get_system_status(self) -> Dict:
@@ -206,32 +220,35 @@ class SemiconductorLithographySystem:
         time.sleep(0.5)
     
     def _get_exposure_parameters(self) -> EmissionParameters:
-        """獲取曝光參數"""
-        recipe_light = self.current_recipe.get("light_source", {})
+        """獲取曝光參數 (加載配方時已預先構造)"""
+        return self._exposure_params
+    
+    def _build_exposure_parameters(self, recipe: Dict) -> EmissionParameters:
+        """根據配方構造曝光參數"""
+        recipe_light = recipe.get("light_source", {})
         
         return EmissionParameters(
             power=recipe_light.get("power", 3.0e-9),
-            duration=self.current_recipe.get("exposure_time", 5.0),
+            duration=recipe.get("exposure_time", 5.0),
             frequency=recipe_light.get("frequency", 1000),
             duty_cycle=recipe_light.get("duty_cycle", 0.5),
             mode=OutputMode.PULSED
         )
     
-    def _execute_exposure_sequence(self):
+    async def _execute_exposure_sequence(self):
         """執行曝光序列"""
         exposure_time = self.current_recipe.get("exposure_time", 5.0)
         
         print(f"⏱ 曝光中... 時長: {exposure_time}秒")
         
-        start_time = time.time()
-        while time.time() - start_time < exposure_time:
-            elapsed = time.time() - start_time
-            progress = min(elapsed / exposure_time, 1.0)
-            
-            if progress % 0.2 < 0.01:
-                print(f"📊 進度: {progress*100:.1f}%")
-            
-            time.sleep(0.1)
+        # 直接睡到下一個報告點，期間事件循環可處理其他任務
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        for checkpoint in EXPOSURE_CHECKPOINTS:
+            remaining = checkpoint * exposure_time - (loop.time() - start_time)
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+            print(f"📊 進度: {checkpoint*100:.1f}%")
     
     def _move_wafer_to_unload(self):
         """移動晶圓到卸載"""
@@ -250,7 +267,7 @@ class SemiconductorLithographySystem:
         """錯誤回調"""
         print(f"🚨 系統錯誤: {error_data}")
 
-def demo_lithography_system():
+async def demo_lithography_system():
     """演示光刻系統"""
     print("=" * 50)
     print("🏭 半導體光刻系統演示")
@@ -260,7 +277,7 @@ def demo_lithography_system():
     litho_system = SemiconductorLithographySystem()
     
     # 初始化
-    if not litho_system.initialize_system():
+    if not await litho_system.initialize_system():
         return
     
     # 加載配方
@@ -279,7 +296,7 @@ def demo_lithography_system():
     
     # 處理晶圓
     wafers = [f"Wafer_{i:03d}" for i in range(1, 4)]
-    results = litho_system.batch_process(wafers)
+    results = await litho_system.batch_process(wafers)
     
     # 顯示結果
     print("\n" + "=" * 50)
@@ -295,8 +312,8 @@ def demo_lithography_system():
     print(f"📦 已處理: {status['wafer_count']}")
     
     # 關閉系統
-    litho_system.light_source.power_off()
+    await litho_system.light_source.power_off()
     print("\n✅ 演示完成")
 
 if __name__ == "__main__":
-    demo_lithography_system()
+    asyncio.run(demo_lithography_system())
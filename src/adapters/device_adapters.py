@@ -4,11 +4,289 @@
 """
 
 import abc
+import asyncio
+import errno
+import functools
+import inspect
+import logging
+import os
+import random
+import sys
+import time
 import serial
 import socket
-from typing import Dict, Any
+import selectors
+import struct
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Any, Callable, List, Optional, Tuple
 import json
 
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:  # 未安裝orjson時退回標準庫
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+    
+    def _json_loads(data) -> Any:
+        # 標準庫不接受memoryview
+        return json.loads(bytes(data))
+
+try:
+    import msgpack
+except ImportError:  # 未安裝msgpack時以太網設備只使用JSON
+    msgpack = None
+
+try:
+    from pymodbus.client import ModbusTcpClient  # pymodbus>=3.0
+    from pymodbus.exceptions import ConnectionException, ModbusException
+except ImportError:  # 未安裝pymodbus時Modbus設備無法連接
+    ModbusTcpClient = None
+    # 無法連接時不會拋出，僅供 except 子句引用
+    ConnectionException = ModbusException = OSError
+
+log = logging.getLogger(__name__)
+
+# 以太網消息幀頭: 4字節大端序消息體長度 (含編碼標識) + 1字節編碼標識
+_FRAME_HEADER = struct.Struct(">IB")
+
+# msgpack uint64 編碼: 類型字節 0xcf + 8字節大端序無符號整數
+_MSGPACK_UINT64 = struct.Struct(">BQ")
+
+# 粗粒度單調時鐘 (Linux上精度約4ms，開銷遠低於time.monotonic)，只用於緩存有效期等粗略判斷
+if hasattr(time, "CLOCK_MONOTONIC_COARSE"):
+    def _coarse_monotonic() -> float:
+        return time.clock_gettime(time.CLOCK_MONOTONIC_COARSE)
+else:
+    _coarse_monotonic = time.monotonic
+
+class _JsonCodec:
+    """JSON消息編碼"""
+    
+    codec_id = 1
+    
+    @staticmethod
+    def command_prefix(command: str, parameters: Dict) -> bytes:
+        return _json_dumps({"command": command, "parameters": parameters})[:-1] + b',"timestamp_ns":'
+    
+    @staticmethod
+    def timestamp_suffix(timestamp_ns: int) -> bytes:
+        return str(timestamp_ns).encode() + b"}"
+    
+    @staticmethod
+    def loads(data) -> Any:
+        return _json_loads(data)
+
+class _MsgpackCodec:
+    """msgpack消息編碼 (比JSON更緊湊，解析更快)"""
+    
+    codec_id = 2
+    
+    @staticmethod
+    def command_prefix(command: str, parameters: Dict) -> bytes:
+        # 時間戳固定為最後一個uint64字段 (佔位值保證按uint64編碼)，去掉後即為可緩存的前綴
+        message = {"command": command, "parameters": parameters, "timestamp_ns": 2 ** 64 - 1}
+        return msgpack.packb(message)[:-_MSGPACK_UINT64.size]
+    
+    @staticmethod
+    def timestamp_suffix(timestamp_ns: int) -> bytes:
+        return _MSGPACK_UINT64.pack(0xcf, timestamp_ns)
+    
+    @staticmethod
+    def loads(data) -> Any:
+        return msgpack.unpackb(data, raw=False)
+
+# 按幀頭中的編碼標識解析響應，兼容仍在使用JSON的設備
+_CODECS = {codec.codec_id: codec for codec in (_JsonCodec, _MsgpackCodec)}
+_CODEC_NAMES = {"json": _JsonCodec, "msgpack": _MsgpackCodec}
+
+# 非阻塞connect發起成功時返回的錯誤碼
+_CONNECT_IN_PROGRESS = {errno.EINPROGRESS, errno.EWOULDBLOCK,
+                        getattr(errno, "WSAEWOULDBLOCK", errno.EWOULDBLOCK)}
+
+# TCP保活參數: 空閒30秒後開始探測，間隔10秒，連續3次無響應判定斷開
+_KEEPALIVE_OPTIONS = (
+    ("TCP_KEEPIDLE", 30),
+    ("TCP_KEEPINTVL", 10),
+    ("TCP_KEEPCNT", 3),
+)
+
+# 響應幀長度上限，超出時視為流已損壞 (避免按錯誤的長度分配大緩衝區)
+_MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+# 每個以太網適配器緩存的命令編碼數量上限
+_COMMAND_CACHE_SIZE = 64
+
+# 串口狀態查詢命令 (不帶參數，預先編碼)
+_SERIAL_STATUS_REQUEST = b"STATUS:{}\r\n"
+
+# Modbus單次讀取的寄存器數量上限 (協議規定125個)
+_MODBUS_MAX_READ = 125
+
+# 默認狀態寄存器佈局: 從起始地址開始依次為 (名稱, 縮放係數)
+_MODBUS_STATUS_REGISTERS = (
+    ("voltage", 0.1),       # 0.1 V
+    ("current", 0.01),      # 0.01 A
+    ("temperature", 0.1),   # 0.1 °C
+)
+
+# USB串口芯片 (FTDI等) 的接收延遲計時器，單位毫秒，驅動默認16
+_USB_SERIAL_LATENCY_TIMER = "/sys/bus/usb-serial/devices/{}/latency_timer"
+
+def _set_low_latency(port: "serial.Serial", device: str) -> Dict:
+    """盡量降低串口響應延遲 (僅Linux有效)，返回實際生效的設置"""
+    applied = {}
+    if not sys.platform.startswith("linux"):
+        return applied
+    
+    # 設置 ASYNC_LOW_LATENCY 標誌 (等同 setserial low_latency)
+    try:
+        port.set_low_latency_mode(True)
+        applied["low_latency"] = True
+    except (AttributeError, ValueError, OSError):
+        applied["low_latency"] = False
+    
+    # 將USB串口延遲計時器調到1ms (需要寫權限)
+    timer_path = _USB_SERIAL_LATENCY_TIMER.format(os.path.basename(os.path.realpath(device)))
+    try:
+        with open(timer_path, "w") as f:
+            f.write("1")
+        with open(timer_path) as f:
+            applied["latency_timer_ms"] = int(f.read())
+    except (OSError, ValueError):
+        pass
+    
+    return applied
+
+def _send_error(e: Exception) -> Dict:
+    """命令失敗時的結構化錯誤結果"""
+    return {
+        "error": "send_failed",
+        "exception": repr(e),
+        # 超時與連接中斷屬於瞬時故障，可重連後重試
+        # (Python 3.10之前 socket.timeout 不是 TimeoutError 的子類)
+        "transient": isinstance(e, (TimeoutError, socket.timeout, ConnectionError))
+    }
+
+# 每個適配器一把鎖，保證同一連接不會被多個線程同時收發
+# (等待超時的調用仍可能在線程中運行，下一次調用需等它結束)
+_adapter_locks = weakref.WeakKeyDictionary()
+_adapter_locks_guard = threading.Lock()
+
+def _adapter_lock(adapter) -> threading.Lock:
+    with _adapter_locks_guard:
+        lock = _adapter_locks.get(adapter)
+        if lock is None:
+            lock = _adapter_locks[adapter] = threading.Lock()
+        return lock
+
+def _locked(adapter, func: Callable, *args) -> Any:
+    """持有適配器鎖執行調用"""
+    with _adapter_lock(adapter):
+        return func(*args)
+
+def _resolve_codec(codec: str):
+    """按名稱取得以太網消息編碼"""
+    if codec not in _CODEC_NAMES:
+        raise ValueError(f"不支持的消息編碼: {codec}")
+    if codec == "msgpack" and msgpack is None:
+        raise ValueError("使用msgpack編碼需要安裝msgpack")
+    return _CODEC_NAMES[codec]
+
+def _parse_frame_header(header) -> Tuple[Any, int]:
+    """
+    解析響應幀頭，返回響應使用的編碼和消息體長度
+    幀頭無效說明流已無法對齊，拋出 ConnectionError 使調用方斷開重連
+    """
+    length, codec_id = _FRAME_HEADER.unpack(header)
+    codec = _CODECS.get(codec_id)
+    if codec is None or length < 1:
+        raise ConnectionError(f"無效的消息幀: 長度={length}, 編碼={codec_id}")
+    if length > _MAX_FRAME_SIZE:
+        raise ConnectionError(f"消息幀過大: 長度={length}")
+    return codec, length - 1
+
+@functools.lru_cache(maxsize=None)
+def _modbus_unit_keyword(client_class) -> str:
+    """從站地址參數名隨pymodbus版本變化: 3.10起為 device_id，3.x早期為 slave，2.x為 unit"""
+    parameters = inspect.signature(client_class.read_holding_registers).parameters
+    for name in ("device_id", "slave"):
+        if name in parameters:
+            return name
+    return "unit"
+
+def _tune_socket(sock):
+    """針對小包請求/響應優化套接字選項"""
+    # 關閉Nagle算法，避免小命令被延遲發送
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    # 立即確認 (僅Linux支持)
+    if hasattr(socket, "TCP_QUICKACK"):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+    
+    # 長連接保活，避免空閒期間被對端或中間設備斷開
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    for name, value in _KEEPALIVE_OPTIONS:
+        if hasattr(socket, name):
+            sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, name), value)
+
+def _status_report(adapters: Dict, configs: Dict, readings: Dict) -> Dict:
+    """組裝系統狀態，設備較多時用局部變量減少屬性查找"""
+    return {
+        device_id: {
+            "connected": adapter.connected,
+            "status": readings[device_id],
+            "config": configs[device_id],
+            "latency": getattr(adapter, "latency_settings", {})
+        }
+        for device_id, adapter in adapters.items()
+    }
+
+def _retry_delays(max_attempts: int, retry_base: float):
+    """各次重試前的等待時間: 指數退避加隨機抖動"""
+    for attempt in range(1, max_attempts):
+        yield retry_base * 2 ** (attempt - 1) + random.uniform(0, retry_base)
+
+def _max_backoff(max_attempts: int, retry_base: float) -> float:
+    """全部重試退避時間之和的上限"""
+    return sum(retry_base * (2 ** i + 1) for i in range(max_attempts - 1))
+
+class _StatusCache:
+    """設備狀態緩存，有效期內的讀數直接返回，不再訪問設備"""
+    
+    def __init__(self):
+        self._entries: Dict[str, Tuple[float, Dict]] = {}
+    
+    def invalidate(self, device_id: str):
+        self._entries.pop(device_id, None)
+    
+    def split(self, adapters: Dict, ttl: float) -> Tuple[Dict, Dict]:
+        """返回 (仍有效的緩存讀數, 需要重新讀取的設備)"""
+        now = _coarse_monotonic()
+        readings = {}
+        stale = {}
+        for device_id, adapter in adapters.items():
+            cached = self._entries.get(device_id)
+            if cached is not None and now - cached[0] < ttl:
+                readings[device_id] = cached[1]
+            else:
+                stale[device_id] = adapter
+        return readings, stale
+    
+    def store(self, fresh: Dict[str, Optional[Dict]]) -> Dict[str, Dict]:
+        """緩存新讀數，讀取超時 (None) 的設備不緩存並返回超時錯誤"""
+        now = _coarse_monotonic()
+        readings = {}
+        for device_id, reading in fresh.items():
+            if reading is None:
+                readings[device_id] = _send_error(TimeoutError("狀態讀取超時"))
+            else:
+                readings[device_id] = reading
+                self._entries[device_id] = (now, reading)
+        return readings
+
 class DeviceAdapter(abc.ABC):
     """設備適配器抽象基類"""
     
@@ -28,57 +306,308 @@ class DeviceAdapter(abc.ABC):
     def read_status(self) -> Dict:
         pass
 
-class EthernetAdapter(DeviceAdapter):
-    """以太網設備適配器"""
+# 可安全緩存編碼結果的參數類型
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+class _CommandEncoder:
+    """以太網命令編碼，需要子類提供 _codec 和 _cmd_cache"""
+    
+    def _build_frame(self, command: str, parameters: Dict,
+                     timestamp_ns: Optional[int] = None) -> bytes:
+        """構造帶長度前綴的命令幀"""
+        return self._seal_frame(self._encode_command(command, parameters), timestamp_ns)
+    
+    def _seal_frame(self, prefix: bytes, timestamp_ns: Optional[int] = None) -> bytes:
+        """在已編碼的命令後補上時間戳並加上幀頭"""
+        if timestamp_ns is None:
+            timestamp_ns = time.time_ns()
+        
+        # 命令消息: 緩存的命令/參數編碼 + 納秒時間戳
+        body = prefix + self._codec.timestamp_suffix(timestamp_ns)
+        return _FRAME_HEADER.pack(len(body) + 1, self._codec.codec_id) + body
+    
+    def _encode_command(self, command: str, parameters: Dict) -> bytes:
+        """編碼消息中時間戳之前的部分，參數全為標量時緩存結果"""
+        key = prefix = None
+        if all(type(v) in _SCALAR_TYPES for v in parameters.values()):
+            # 鍵中帶上類型，避免 1 / 1.0 / True 互相命中；
+            # 元組等容器內的元素類型不在鍵中，因此不緩存
+            key = (command, frozenset((k, type(v), v) for k, v in parameters.items()))
+            prefix = self._cmd_cache.get(key)
+        
+        if prefix is None:
+            prefix = self._codec.command_prefix(command, parameters)
+            if key is not None and len(self._cmd_cache) < _COMMAND_CACHE_SIZE:
+                self._cmd_cache[key] = prefix
+        return prefix
+
+class EthernetAdapter(_CommandEncoder, DeviceAdapter):
+    """
+    以太網設備適配器
+    每條消息以4字節大端序長度和1字節編碼標識開頭，後接JSON或msgpack消息體
+    """
     
-    def __init__(self, host: str, port: int, timeout: float = 5.0):
+    def __init__(self, host: str, port: int, timeout: float = 5.0,
+                 buffer_size: int = 256 * 1024, connect_timeout: float = 1.0,
+                 codec: str = "json"):
         self.host = host
         self.port = port
         self.timeout = timeout
+        self.connect_timeout = connect_timeout  # 建立連接的時限 (秒)
+        self._codec = _resolve_codec(codec)     # 發送命令使用的編碼 (msgpack需設備支持，按設備顯式開啟)
+        self.buffer_size = buffer_size  # 收發緩衝區大小 (字節)
         self.socket = None
         self.connected = False
+        self._cmd_cache: Dict[tuple, bytes] = {}
+        self._rx = bytearray(4096)  # 重複使用的接收緩衝區
+        self.start_response()
+        # 狀態輪詢命令固定不變，預先編碼
+        self._status_prefix = self._codec.command_prefix("read_status", {})
     
     def connect(self) -> bool:
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.socket.settimeout(self.timeout)
-            self.socket.connect((self.host, self.port))
+            # 緩衝區需在連接前設置，才能參與TCP窗口協商
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.buffer_size)
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.buffer_size)
+            self._connect_with_deadline()
+            _tune_socket(self.socket)
             self.connected = True
             return True
         except Exception as e:
-            print(f"以太網連接失敗: {e}")
+            log.warning("以太網連接失敗 %s:%s: %s", self.host, self.port, e)
+            if self.socket:
+                self.socket.close()
             return False
     
+    def _connect_with_deadline(self):
+        """非阻塞發起連接，在 connect_timeout 內未完成則放棄"""
+        self.socket.setblocking(False)
+        err = self.socket.connect_ex((self.host, self.port))
+        if err and err not in _CONNECT_IN_PROGRESS:
+            raise OSError(err, os.strerror(err))
+        
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.socket, selectors.EVENT_WRITE)
+            if not selector.select(timeout=self.connect_timeout):
+                raise TimeoutError(f"連接超時 ({self.connect_timeout}s)")
+        
+        err = self.socket.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        if err:
+            raise OSError(err, os.strerror(err))
+        
+        # 恢復為帶超時的阻塞模式
+        self.socket.settimeout(self.timeout)
+    
+    def is_healthy(self) -> bool:
+        """檢查連接是否仍可用 (對端已關閉或有未讀的遲到數據都視為失效)"""
+        if not self.connected:
+            return False
+        
+        try:
+            if self.socket.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR):
+                return False
+            self.socket.setblocking(False)
+            self.socket.recv(1, socket.MSG_PEEK)
+        except BlockingIOError:
+            return True
+        except OSError:
+            return False
+        finally:
+            self.socket.settimeout(self.timeout)
+        
+        return False
+    
     def disconnect(self):
         if self.socket:
             self.socket.close()
         self.connected = False
     
     def send_command(self, command: str, parameters: Dict) -> Dict:
+        return self._request(self._encode_command(command, parameters))
+    
+    def _request(self, prefix: bytes) -> Dict:
+        """發送已編碼的命令並等待響應"""
         if not self.connected:
             return {"error": "設備未連接"}
         
         try:
-            # 構造命令消息
-            message = {
-                "command": command,
-                "parameters": parameters,
-                "timestamp": time.time()
-            }
-            
-            # 發送JSON格式命令
-            message_str = json.dumps(message) + "\n"
-            self.socket.send(message_str.encode())
-            
-            # 接收響應
-            response = self.socket.recv(1024).decode().strip()
-            return json.loads(response)
+            self.socket.sendall(self._seal_frame(prefix))
+            return self.receive_response()
             
         except Exception as e:
-            return {"error": f"命令發送失敗: {e}"}
+            error = _send_error(e)
+            if error["transient"]:
+                # 響應可能遲到，流已無法對齊，斷開等待重連
+                self.disconnect()
+            return error
+    
+    def send_request(self, command: str, parameters: Dict, timestamp_ns: Optional[int] = None):
+        """只發送命令，不等待響應 (供批量發送後統一收取)"""
+        self.socket.sendall(self._build_frame(command, parameters, timestamp_ns))
+    
+    def receive_response(self) -> Dict:
+        """
+        接收一條完整的命令響應
+        幀頭和消息體一起讀入可重用的接收緩衝區，小響應通常一次recv_into即可收完
+        """
+        self.start_response()
+        while not self.feed_response():
+            pass
+        return self.finish_response()
+    
+    def start_response(self):
+        """開始接收一條新響應 (與 feed_response / finish_response 配合，可在非阻塞套接字上分段接收)"""
+        self._rx_view = memoryview(self._rx)
+        self._rx_received = 0
+        self._rx_frame = None  # 幀頭收齊後為 (編碼, 幀總長度)
+    
+    def feed_response(self) -> bool:
+        """
+        接收一次數據，處理TCP分段導致的短讀，響應收齊時返回True
+        幀頭未收齊前盡量填滿緩衝區，之後只讀到本幀結尾
+        """
+        end = None if self._rx_frame is None else self._rx_frame[1]
+        n = self.socket.recv_into(self._rx_view[self._rx_received:end])
+        if n == 0:
+            raise ConnectionError("連接已被對端關閉")
+        self._rx_received += n
+        
+        if self._rx_frame is None and self._rx_received >= _FRAME_HEADER.size:
+            codec, size = _parse_frame_header(self._rx_view[:_FRAME_HEADER.size])
+            total = _FRAME_HEADER.size + size
+            if self._rx_received > total:
+                # 一問一答的連接上不應有多餘數據，說明流已無法對齊
+                raise ConnectionError("收到多餘的響應數據")
+            if total > len(self._rx_view):
+                # 大響應使用臨時緩衝區，只複製已收到的少量數據
+                buffer = bytearray(total)
+                buffer[:self._rx_received] = self._rx_view[:self._rx_received]
+                self._rx_view = memoryview(buffer)
+            self._rx_frame = (codec, total)
+        
+        return self._rx_frame is not None and self._rx_received == self._rx_frame[1]
+    
+    def finish_response(self) -> Dict:
+        """解析已收齊的響應，返回後接收緩衝區可被下一條響應複用"""
+        codec, total = self._rx_frame
+        return codec.loads(self._rx_view[_FRAME_HEADER.size:total])
     
     def read_status(self) -> Dict:
-        return self.send_command("read_status", {})
+        return self._request(self._status_prefix)
+
+class AsyncEthernetAdapter(_CommandEncoder):
+    """
+    異步以太網設備適配器
+    消息幀與 EthernetAdapter 相同，基於asyncio流收發，可與其他設備共用一個事件循環
+    """
+    
+    def __init__(self, host: str, port: int, timeout: float = 5.0,
+                 connect_timeout: float = 1.0, codec: str = "json"):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self._codec = _resolve_codec(codec)
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.connected = False
+        self._cmd_cache: Dict[tuple, bytes] = {}
+        # 同一連接上一次只能有一條命令在途，否則響應無法對應
+        self._lock = asyncio.Lock()
+        self._status_prefix = self._codec.command_prefix("read_status", {})
+    
+    async def connect(self) -> bool:
+        try:
+            self.reader, self.writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), self.connect_timeout)
+            _tune_socket(self.writer.get_extra_info("socket"))
+            self.connected = True
+            return True
+        except Exception as e:
+            log.warning("以太網連接失敗 %s:%s: %s", self.host, self.port, e)
+            if self.writer:
+                self.writer.close()
+            return False
+    
+    def is_healthy(self) -> bool:
+        """檢查連接是否仍可用 (對端已關閉視為失效)"""
+        return self.connected and not self.reader.at_eof() and not self.writer.is_closing()
+    
+    async def disconnect(self):
+        if self.writer:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+        self.connected = False
+    
+    async def send_command(self, command: str, parameters: Dict,
+                           timestamp_ns: Optional[int] = None) -> Dict:
+        return await self._request(self._encode_command(command, parameters), timestamp_ns)
+    
+    async def _request(self, prefix: bytes, timestamp_ns: Optional[int] = None) -> Dict:
+        """發送已編碼的命令並等待響應"""
+        if not self.connected:
+            return {"error": "設備未連接"}
+        
+        async with self._lock:
+            try:
+                self.writer.write(self._seal_frame(prefix, timestamp_ns))
+                await self.writer.drain()
+                return await asyncio.wait_for(self._receive_response(), self.timeout)
+                
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    e = TimeoutError("響應超時")
+                error = _send_error(e)
+                if error["transient"]:
+                    # 響應可能遲到，流已無法對齊，斷開等待重連
+                    await self.disconnect()
+                return error
+            
+            except BaseException:
+                # 請求被取消時響應仍可能到達，同樣斷開 (不等待關閉完成)
+                self.writer.close()
+                self.connected = False
+                raise
+    
+    async def _receive_response(self) -> Dict:
+        """接收一條完整的命令響應"""
+        try:
+            codec, size = _parse_frame_header(await self.reader.readexactly(_FRAME_HEADER.size))
+            return codec.loads(await self.reader.readexactly(size))
+        except asyncio.IncompleteReadError as e:
+            raise ConnectionError("連接已被對端關閉") from e
+    
+    async def read_status(self) -> Dict:
+        return await self._request(self._status_prefix)
+
+class _SerialLineReader:
+    """按塊讀取串口數據並按行切分，避免pyserial readline逐字節讀取"""
+    
+    def __init__(self, port: "serial.Serial"):
+        self._port = port
+        self._buffer = bytearray()
+    
+    def readline(self, terminator: bytes = b"\n") -> bytes:
+        """讀取一行 (含行尾)，超時則返回已收到的部分"""
+        while True:
+            index = self._buffer.find(terminator)
+            if index >= 0:
+                end = index + len(terminator)
+                line = bytes(self._buffer[:end])
+                del self._buffer[:end]
+                return line
+            
+            chunk = self._port.read(self._port.in_waiting or 1)
+            if not chunk:
+                line = bytes(self._buffer)
+                self._buffer.clear()
+                return line
+            self._buffer += chunk
 
 class SerialAdapter(DeviceAdapter):
     """串口設備適配器"""
@@ -87,7 +616,9 @@ class SerialAdapter(DeviceAdapter):
         self.port = port
         self.baudrate = baudrate
         self.serial = None
+        self._reader = None
         self.connected = False
+        self.latency_settings = {}  # 連接時實際生效的低延遲設置
     
     def connect(self) -> bool:
         try:
@@ -96,10 +627,12 @@ class SerialAdapter(DeviceAdapter):
                 baudrate=self.baudrate,
                 timeout=1.0
             )
+            self.latency_settings = _set_low_latency(self.serial, self.port)
+            self._reader = _SerialLineReader(self.serial)
             self.connected = True
             return True
         except Exception as e:
-            print(f"串口連接失敗: {e}")
+            log.warning("串口連接失敗 %s: %s", self.port, e)
             return False
     
     def disconnect(self):
@@ -108,69 +641,188 @@ class SerialAdapter(DeviceAdapter):
         self.connected = False
     
     def send_command(self, command: str, parameters: Dict) -> Dict:
+        # 簡單的命令協議
+        return self._request(command.encode() + b":" + _json_dumps(parameters) + b"\r\n")
+    
+    def _request(self, payload: bytes) -> Dict:
+        """寫入一行命令並讀取響應"""
         if not self.connected:
             return {"error": "設備未連接"}
         
         try:
-            # 簡單的命令協議
-            command_str = f"{command}:{json.dumps(parameters)}\r\n"
-            self.serial.write(command_str.encode())
+            self.serial.write(payload)
             
             # 讀取響應
-            response = self.serial.readline().decode().strip()
-            return json.loads(response)
+            line = self._reader.readline()
+            if not line.endswith(b"\n"):
+                # 超時未收到完整一行: 丟棄殘留數據，避免遲到的行尾被當作下一條響應
+                self.serial.reset_input_buffer()
+                raise TimeoutError("串口響應超時")
+            return _json_loads(line)
             
         except Exception as e:
-            return {"error": f"命令發送失敗: {e}"}
+            return _send_error(e)
     
     def read_status(self) -> Dict:
-        return self.send_command("STATUS", {})
+        return self._request(_SERIAL_STATUS_REQUEST)
 
 class ModbusTCPAdapter(DeviceAdapter):
-    """Modbus TCP適配器 (工業標準協議)"""
+    """
+    Modbus TCP適配器 (工業標準協議)
+    狀態寄存器連續排列，一次讀取全部狀態只需一個往返
+    """
     
-    def __init__(self, host: str, port: int = 502):
+    def __init__(self, host: str, port: int = 502, unit: int = 1, timeout: float = 3.0,
+                 status_address: int = 0,
+                 status_registers: Tuple[Tuple[str, float], ...] = _MODBUS_STATUS_REGISTERS):
+        if len(status_registers) > _MODBUS_MAX_READ:
+            raise ValueError(f"狀態寄存器數量超過單次讀取上限 {_MODBUS_MAX_READ}")
+        
         self.host = host
         self.port = port
+        self.unit = unit        # 從站地址
+        self.timeout = timeout
+        self.status_address = status_address
+        self.status_registers = status_registers
+        self.client = None
         self.connected = False
+        self._unit_kwargs = {}  # 按pymodbus版本傳遞從站地址的關鍵字參數
     
     def connect(self) -> bool:
-        # 實際實現會使用pymodbus等庫
-        self.connected = True
-        return True
+        if ModbusTcpClient is None:
+            log.warning("Modbus連接失敗 %s:%s: 需要安裝pymodbus", self.host, self.port)
+            return False
+        
+        try:
+            self._unit_kwargs = {_modbus_unit_keyword(ModbusTcpClient): self.unit}
+            self.client = ModbusTcpClient(self.host, port=self.port, timeout=self.timeout)
+            self.connected = bool(self.client.connect())
+            if not self.connected:
+                log.warning("Modbus連接失敗 %s:%s", self.host, self.port)
+            return self.connected
+        except Exception as e:
+            log.warning("Modbus連接失敗 %s:%s: %s", self.host, self.port, e)
+            return False
     
     def disconnect(self):
+        if self.client:
+            self.client.close()
         self.connected = False
     
+    def read_holding_registers(self, address: int, count: int) -> List[int]:
+        """讀取連續的保持寄存器 (功能碼03)，count 最多125"""
+        if not 1 <= count <= _MODBUS_MAX_READ:
+            raise ValueError(f"寄存器數量必須在1到{_MODBUS_MAX_READ}之間: {count}")
+        response = self.client.read_holding_registers(address, count=count, **self._unit_kwargs)
+        return self._registers(response)
+    
+    def read_write_registers(self, read_address: int, read_count: int,
+                             write_address: int, values: List[int]) -> List[int]:
+        """在一個事務中寫入並讀取保持寄存器 (功能碼23)"""
+        if not 1 <= read_count <= _MODBUS_MAX_READ:
+            raise ValueError(f"寄存器數量必須在1到{_MODBUS_MAX_READ}之間: {read_count}")
+        response = self.client.readwrite_registers(
+            read_address=read_address, read_count=read_count,
+            write_address=write_address, values=values, **self._unit_kwargs)
+        return self._registers(response)
+    
+    @staticmethod
+    def _modbus_error(e: Exception) -> Dict:
+        """通信錯誤轉為結構化結果 (參數類型錯誤等編程錯誤不在此捕獲)"""
+        if isinstance(e, ConnectionException):
+            return _send_error(ConnectionError(str(e)))
+        return _send_error(e)
+    
+    @staticmethod
+    def _registers(response) -> List[int]:
+        if response.isError():
+            raise IOError(f"Modbus請求失敗: {response}")
+        return response.registers
+    
     def send_command(self, command: str, parameters: Dict) -> Dict:
+        """
+        支持的命令:
+        read_registers (address, count)、write_registers (address, values)、
+        read_write_registers (read_address, read_count, write_address, values)
+        """
         if not self.connected:
             return {"error": "設備未連接"}
         
-        # Modbus協議實現
-        return {"status": "success", "protocol": "modbus_tcp"}
+        try:
+            if command == "read_registers":
+                registers = self.read_holding_registers(parameters["address"], parameters["count"])
+            elif command == "write_registers":
+                self._registers(self.client.write_registers(
+                    parameters["address"], parameters["values"], **self._unit_kwargs))
+                registers = []
+            elif command == "read_write_registers":
+                registers = self.read_write_registers(
+                    parameters["read_address"], parameters["read_count"],
+                    parameters["write_address"], parameters["values"])
+            else:
+                return {"error": f"不支持的Modbus命令: {command}"}
+            return {"status": "success", "protocol": "modbus_tcp", "registers": registers}
+            
+        except (KeyError, ValueError) as e:
+            return {"error": f"無效的Modbus命令參數: {e!r}"}
+        except (ModbusException, OSError) as e:
+            return self._modbus_error(e)
     
     def read_status(self) -> Dict:
-        # 讀取保持寄存器等
-        return {"voltage": 220, "current": 1.5, "temperature": 25.5}
+        """一次讀取全部狀態寄存器，再按佈局換算"""
+        if not self.connected:
+            return {"error": "設備未連接"}
+        
+        try:
+            registers = self.read_holding_registers(self.status_address, len(self.status_registers))
+        except (ModbusException, OSError) as e:
+            return self._modbus_error(e)
+        return {name: value * scale
+                for (name, scale), value in zip(self.status_registers, registers)}
 
 class DeviceManager:
     """設備管理器 - 統一管理多種設備接口"""
     
-    def __init__(self):
+    def __init__(self, max_workers: int = 32, call_timeout: float = 10.0,
+                 status_ttl: float = 0.25, max_attempts: int = 3,
+                 retry_base: float = 0.05):
         self.adapters = {}
         self.device_configs = {}
+        self.call_timeout = call_timeout  # 並行調用的整體等待時限 (秒)
+        self.status_ttl = status_ttl      # 設備狀態緩存有效期 (秒)
+        self.max_attempts = max_attempts  # 每條命令最多嘗試次數
+        self.retry_base = retry_base      # 重試退避基準時間 (秒)
+        self._status_cache = _StatusCache()
+        # 設備I/O會釋放GIL，用線程池並行訪問各設備
+        self._pool = ThreadPoolExecutor(max_workers=max_workers,
+                                        thread_name_prefix="device-io")
     
     def register_device(self, device_id: str, adapter: DeviceAdapter, config: Dict):
-        """註冊設備"""
+        """註冊設備並立即建立長連接"""
         self.adapters[device_id] = adapter
         self.device_configs[device_id] = config
+        self._status_cache.invalidate(device_id)
+        self._ensure_connected(adapter)
     
     def connect_all(self) -> Dict[str, bool]:
-        """連接所有設備"""
-        results = {}
-        for device_id, adapter in self.adapters.items():
-            results[device_id] = adapter.connect()
-        return results
+        """連接所有設備 (並行，已連接的設備保持原連接)"""
+        futures = self._submit_all(self.adapters, self._ensure_connected)
+        return self._gather(futures, False)
+    
+    @staticmethod
+    def _ensure_connected(adapter: DeviceAdapter) -> bool:
+        """未連接時才建立連接，避免重複握手"""
+        with _adapter_lock(adapter):
+            return adapter.connected or adapter.connect()
+    
+    @staticmethod
+    def _health_check(adapter: DeviceAdapter):
+        """發送前確認連接可用，未連接或已失效的連接自動重連"""
+        if not adapter.connected:
+            adapter.connect()
+        elif isinstance(adapter, EthernetAdapter) and not adapter.is_healthy():
+            adapter.disconnect()
+            adapter.connect()
     
     def send_to_device(self, device_id: str, command: str, params: Dict) -> Dict:
         """向指定設備發送命令"""
@@ -178,22 +830,289 @@ class DeviceManager:
             return {"error": f"設備未註冊: {device_id}"}
         
         adapter = self.adapters[device_id]
-        return adapter.send_command(command, params)
+        return self._call_with_retry(adapter, command, params)
+    
+    def _call_with_retry(self, adapter: DeviceAdapter, command: str, params: Dict,
+                         result: Dict = None) -> Dict:
+        """
+        發送命令，瞬時故障時按指數退避加隨機抖動重試
+        已有首次調用結果時可通過 result 傳入，直接從重試開始
+        """
+        with _adapter_lock(adapter):
+            return self._retry_locked(adapter, command, params, result)
+    
+    def _retry_locked(self, adapter: DeviceAdapter, command: str, params: Dict,
+                      result: Optional[Dict]) -> Dict:
+        if result is None:
+            self._health_check(adapter)
+            result = adapter.send_command(command, params)
+        
+        for delay in _retry_delays(self.max_attempts, self.retry_base):
+            if not result.get("transient"):
+                break
+            time.sleep(delay)
+            
+            # 重建連接後再試
+            adapter.disconnect()
+            if adapter.connect():
+                result = adapter.send_command(command, params)
+        
+        return result
     
     def broadcast_command(self, command: str, params: Dict) -> Dict[str, Dict]:
-        """廣播命令到所有設備"""
+        """
+        廣播命令到所有設備
+        以太網設備先一次性發出全部請求，再按到達順序收取響應，
+        總延遲取決於最慢的設備而非所有設備延遲之和
+        """
+        results = {}
+        pending = {}
+        others = {}
+        for device_id, adapter in self.adapters.items():
+            # 仍被上一次超時調用佔用的連接交給線程池排隊
+            if (isinstance(adapter, EthernetAdapter) and adapter.connected
+                    and _adapter_lock(adapter).acquire(blocking=False)):
+                pending[device_id] = adapter
+            else:
+                others[device_id] = adapter
+        
+        # 其他設備交給線程池，與以太網批量收發同時進行
+        futures = self._submit_all(
+            others, lambda adapter: self._call_with_retry(adapter, command, params))
+        
+        try:
+            # 同一次廣播的所有以太網設備共用一個時間戳
+            timestamp_ns = time.time_ns()
+            for device_id, adapter in list(pending.items()):
+                try:
+                    self._health_check(adapter)
+                    adapter.send_request(command, params, timestamp_ns)
+                except Exception as e:
+                    results[device_id] = _send_error(e)
+            
+            sent = {device_id: adapter for device_id, adapter in pending.items()
+                    if device_id not in results}
+            if sent:
+                results.update(self._collect_responses(sent))
+        finally:
+            for adapter in pending.values():
+                _adapter_lock(adapter).release()
+        
+        # 以太網設備的瞬時故障並行重試
+        retries = {
+            device_id: self._pool.submit(
+                self._call_with_retry, adapter, command, params, results[device_id])
+            for device_id, adapter in pending.items()
+            if results[device_id].get("transient")
+        }
+        futures.update(retries)
+        results.update(self._gather(futures, _send_error(TimeoutError("響應超時"))))
+        
+        return {device_id: results[device_id] for device_id in self.adapters}
+    
+    def _collect_responses(self, pending: Dict[str, "EthernetAdapter"]) -> Dict[str, Dict]:
+        """
+        等待並收取已發出請求的以太網設備響應
+        套接字保持非阻塞，每個設備的半幀數據分別累積，慢設備不會阻塞其他設備的接收
+        """
         results = {}
-        for device_id in self.adapters:
-            results[device_id] = self.send_to_device(device_id, command, params)
+        deadline = time.monotonic() + max(adapter.timeout for adapter in pending.values())
+        
+        with selectors.DefaultSelector() as selector:
+            for device_id, adapter in pending.items():
+                adapter.start_response()
+                adapter.socket.setblocking(False)
+                selector.register(adapter.socket, selectors.EVENT_READ, device_id)
+            
+            try:
+                while selector.get_map():
+                    # 截止時間到後再收取一輪已到達的數據，避免已響應的設備被判為超時
+                    remaining = max(deadline - time.monotonic(), 0)
+                    events = selector.select(timeout=remaining)
+                    if not events and remaining == 0:
+                        break
+                    
+                    for key, _ in events:
+                        device_id = key.data
+                        adapter = pending[device_id]
+                        try:
+                            if not adapter.feed_response():
+                                continue
+                            results[device_id] = adapter.finish_response()
+                        except BlockingIOError:
+                            continue
+                        except Exception as e:
+                            results[device_id] = _send_error(e)
+                        selector.unregister(key.fileobj)
+                    
+                    if remaining == 0:
+                        break
+            finally:
+                for adapter in pending.values():
+                    adapter.socket.settimeout(adapter.timeout)
+        
+        for device_id in pending.keys() - results.keys():
+            results[device_id] = _send_error(TimeoutError("響應超時"))
+        
+        # 出現瞬時故障的連接可能收到遲到的響應，斷開等待重連
+        for device_id, result in results.items():
+            if result.get("transient"):
+                pending[device_id].disconnect()
+        
         return results
     
     def get_system_status(self) -> Dict:
-        """獲取系統所有設備狀態"""
-        status = {}
-        for device_id, adapter in self.adapters.items():
-            status[device_id] = {
-                "connected": adapter.connected,
-                "status": adapter.read_status(),
-                "config": self.device_configs[device_id]
-            }
-        return status
+        """獲取系統所有設備狀態 (並行讀取，有效期內直接使用緩存)"""
+        readings, stale = self._status_cache.split(self.adapters, self.status_ttl)
+        if stale:
+            futures = self._submit_all(stale, self._read_status)
+            readings.update(self._status_cache.store(self._gather(futures, None)))
+        
+        return _status_report(self.adapters, self.device_configs, readings)
+    
+    def _read_status(self, adapter: DeviceAdapter) -> Dict:
+        """讀取設備狀態，連接已斷開時先嘗試重連"""
+        with _adapter_lock(adapter):
+            self._health_check(adapter)
+            return adapter.read_status()
+    
+    def close(self):
+        """關閉線程池並斷開所有設備，等待仍在執行的設備調用結束"""
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        for adapter in self.adapters.values():
+            _locked(adapter, adapter.disconnect)
+        self._status_cache = _StatusCache()
+    
+    def _submit_all(self, adapters: Dict[str, DeviceAdapter], call: Callable) -> Dict:
+        """將對每個設備的調用提交到線程池"""
+        return {device_id: self._pool.submit(call, adapter)
+                for device_id, adapter in adapters.items()}
+    
+    def _gather(self, futures: Dict, on_timeout: Any) -> Dict:
+        """等待並行調用完成，超時未完成的設備返回 on_timeout"""
+        wait(futures.values(), timeout=self.call_timeout)
+        return {device_id: future.result() if future.done() else on_timeout
+                for device_id, future in futures.items()}
+
+class AsyncDeviceManager:
+    """
+    異步設備管理器 - 所有設備共用一個事件循環
+    異步適配器直接在事件循環中收發，串口/Modbus等同步適配器在線程中執行
+    """
+    
+    def __init__(self, call_timeout: float = 10.0, status_ttl: float = 0.25,
+                 max_attempts: int = 3, retry_base: float = 0.05):
+        self.adapters = {}
+        self.device_configs = {}
+        self.call_timeout = call_timeout  # 單個設備調用的等待時限下限 (秒)，不足以完成全部重試時自動延長
+        self.status_ttl = status_ttl      # 設備狀態緩存有效期 (秒)
+        self.max_attempts = max_attempts  # 每條命令最多嘗試次數
+        self.retry_base = retry_base      # 重試退避基準時間 (秒)
+        self._status_cache = _StatusCache()
+    
+    async def register_device(self, device_id: str, adapter, config: Dict):
+        """註冊設備並立即建立長連接"""
+        self.adapters[device_id] = adapter
+        self.device_configs[device_id] = config
+        self._status_cache.invalidate(device_id)
+        await self._ensure_connected(adapter)
+    
+    async def connect_all(self) -> Dict[str, bool]:
+        """連接所有設備 (並發，已連接的設備保持原連接)"""
+        return await self._gather_all(self.adapters, self._ensure_connected, False)
+    
+    @staticmethod
+    async def _call(adapter, method: str, *args) -> Any:
+        """調用適配器方法，同步適配器放到線程中執行以免阻塞事件循環"""
+        if isinstance(adapter, AsyncEthernetAdapter):
+            return await getattr(adapter, method)(*args)
+        return await asyncio.to_thread(_locked, adapter, getattr(adapter, method), *args)
+    
+    async def _ensure_connected(self, adapter) -> bool:
+        """未連接時才建立連接，避免重複握手"""
+        return adapter.connected or await self._call(adapter, "connect")
+    
+    async def _health_check(self, adapter):
+        """發送前確認連接可用，未連接或已失效的連接自動重連"""
+        if not isinstance(adapter, AsyncEthernetAdapter):
+            await asyncio.to_thread(_locked, adapter, DeviceManager._health_check, adapter)
+        elif not adapter.connected:
+            await adapter.connect()
+        elif not adapter.is_healthy():
+            await adapter.disconnect()
+            await adapter.connect()
+    
+    async def send_to_device(self, device_id: str, command: str, params: Dict) -> Dict:
+        """向指定設備發送命令"""
+        if device_id not in self.adapters:
+            return {"error": f"設備未註冊: {device_id}"}
+        
+        return await self._call_with_retry(self.adapters[device_id], command, params)
+    
+    async def _call_with_retry(self, adapter, command: str, params: Dict,
+                               timestamp_ns: Optional[int] = None) -> Dict:
+        """發送命令，瞬時故障時按指數退避加隨機抖動重試"""
+        await self._health_check(adapter)
+        if isinstance(adapter, AsyncEthernetAdapter):
+            result = await adapter.send_command(command, params, timestamp_ns)
+        else:
+            result = await self._call(adapter, "send_command", command, params)
+        
+        for delay in _retry_delays(self.max_attempts, self.retry_base):
+            if not result.get("transient"):
+                break
+            await asyncio.sleep(delay)
+            
+            # 重建連接後再試
+            await self._call(adapter, "disconnect")
+            if await self._call(adapter, "connect"):
+                result = await self._call(adapter, "send_command", command, params)
+        
+        return result
+    
+    async def broadcast_command(self, command: str, params: Dict) -> Dict[str, Dict]:
+        """
+        廣播命令到所有設備
+        全部設備並發收發，總延遲取決於最慢的設備，同一次廣播共用一個時間戳
+        """
+        timestamp_ns = time.time_ns()
+        return await self._gather_all(
+            self.adapters,
+            lambda adapter: self._call_with_retry(adapter, command, params, timestamp_ns),
+            _send_error(TimeoutError("響應超時")))
+    
+    async def get_system_status(self) -> Dict:
+        """獲取系統所有設備狀態 (並發讀取，有效期內直接使用緩存)"""
+        readings, stale = self._status_cache.split(self.adapters, self.status_ttl)
+        if stale:
+            fresh = await self._gather_all(stale, self._read_status, None)
+            readings.update(self._status_cache.store(fresh))
+        
+        return _status_report(self.adapters, self.device_configs, readings)
+    
+    async def _read_status(self, adapter) -> Dict:
+        """讀取設備狀態，連接已斷開時先嘗試重連"""
+        await self._health_check(adapter)
+        return await self._call(adapter, "read_status")
+    
+    async def disconnect_all(self):
+        """斷開所有設備"""
+        await asyncio.gather(*(self._call(adapter, "disconnect")
+                               for adapter in self.adapters.values()))
+    
+    async def _gather_all(self, adapters: Dict, call: Callable, on_timeout: Any) -> Dict:
+        """並發調用每個設備，超時未完成的設備返回 on_timeout"""
+        async def guarded(adapter):
+            try:
+                return await asyncio.wait_for(call(adapter), self._time_budget(adapter))
+            except asyncio.TimeoutError:
+                return on_timeout
+        
+        results = await asyncio.gather(*(guarded(adapter) for adapter in adapters.values()))
+        return dict(zip(adapters, results))
+    
+    def _time_budget(self, adapter) -> float:
+        """單個設備調用的等待時限，至少覆蓋全部重試 (每次重連、收發及退避) 的最長耗時"""
+        attempt = getattr(adapter, "connect_timeout", 0) + getattr(adapter, "timeout", 0)
+        return max(self.call_timeout,
+                   self.max_attempts * attempt + _max_backoff(self.max_attempts, self.retry_base))
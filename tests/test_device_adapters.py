@@ -0,0 +1,674 @@
+import asyncio
+import json
+import socket
+import struct
+import threading
+import time
+
+import pytest
+from src.adapters import device_adapters
+from src.adapters.device_adapters import (
+    AsyncDeviceManager, AsyncEthernetAdapter, DeviceManager, EthernetAdapter,
+    ModbusTCPAdapter, SerialAdapter
+)
+
+FRAME_HEADER = struct.Struct(">IB")
+JSON_CODEC = 1
+MSGPACK_CODEC = 2
+
+
+def _frame(payload: dict, codec_id: int = JSON_CODEC) -> bytes:
+    """按設備協議編碼一條響應幀"""
+    if codec_id == MSGPACK_CODEC:
+        import msgpack
+        body = msgpack.packb(payload)
+    else:
+        body = json.dumps(payload).encode()
+    return FRAME_HEADER.pack(len(body) + 1, codec_id) + body
+
+
+class FakeDevice:
+    """本地回環上的模擬以太網設備，按 reply(request, count) 返回的數據塊依次發送響應"""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.requests = []
+        self._listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._listener.bind(("127.0.0.1", 0))
+        self._listener.listen(8)
+        self.port = self._listener.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self._listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        with conn:
+            while True:
+                header = conn.recv(FRAME_HEADER.size, socket.MSG_WAITALL)
+                if len(header) < FRAME_HEADER.size:
+                    return
+                length, codec_id = FRAME_HEADER.unpack(header)
+                body = conn.recv(length - 1, socket.MSG_WAITALL)
+                if codec_id == MSGPACK_CODEC:
+                    import msgpack
+                    request = msgpack.unpackb(body)
+                else:
+                    request = json.loads(body)
+                self.requests.append(request)
+
+                try:
+                    for chunk in self.reply(request, len(self.requests)):
+                        if isinstance(chunk, float):
+                            time.sleep(chunk)
+                        else:
+                            conn.sendall(chunk)
+                except OSError:
+                    return
+
+    def close(self):
+        self._listener.close()
+
+
+@pytest.fixture
+def device_factory():
+    devices = []
+
+    def create(reply):
+        device = FakeDevice(reply)
+        devices.append(device)
+        return device
+
+    yield create
+    for device in devices:
+        device.close()
+
+
+def _echo(request, count):
+    return [_frame({"echo": request["command"], "count": count})]
+
+
+class TestEthernetFraming:
+    """以太網消息幀收發測試"""
+
+    def test_reply_split_across_segments(self, device_factory):
+        """響應被拆成多個TCP分段時仍能完整接收"""
+        def split(request, count):
+            data = _frame({"echo": request["command"], "pad": "x" * 100})
+            return [data[:3], 0.05, data[3:20], 0.05, data[20:]]
+
+        device = device_factory(split)
+        adapter = EthernetAdapter("127.0.0.1", device.port)
+        assert adapter.connect()
+
+        result = adapter.send_command("SPLIT", {})
+        assert result == {"echo": "SPLIT", "pad": "x" * 100}
+        adapter.disconnect()
+
+    def test_reply_larger_than_receive_buffer(self, device_factory):
+        """超過4KiB接收緩衝區的響應"""
+        device = device_factory(lambda request, count: [_frame({"pad": "y" * 20000})])
+        adapter = EthernetAdapter("127.0.0.1", device.port)
+        assert adapter.connect()
+
+        assert adapter.send_command("BIG", {}) == {"pad": "y" * 20000}
+        # 大響應後接收緩衝區仍可正常復用
+        assert adapter.send_command("BIG", {}) == {"pad": "y" * 20000}
+        adapter.disconnect()
+
+    def test_surplus_bytes_after_frame(self, device_factory):
+        """幀後多餘數據視為流失步，斷開連接並標記為瞬時故障"""
+        device = device_factory(lambda request, count: [_frame({"ok": True}) + b"junk"])
+        adapter = EthernetAdapter("127.0.0.1", device.port)
+        assert adapter.connect()
+
+        result = adapter.send_command("X", {})
+        assert result["error"] == "send_failed"
+        assert result["transient"] is True
+        assert not adapter.connected
+
+    @pytest.mark.parametrize("header", [
+        FRAME_HEADER.pack(2 ** 31, JSON_CODEC),  # 超過幀長度上限
+        FRAME_HEADER.pack(5, 99),                 # 未知編碼
+        FRAME_HEADER.pack(0, JSON_CODEC),         # 長度缺少編碼字節
+    ])
+    def test_bad_header_disconnects(self, device_factory, header):
+        """無效或過大的幀頭不分配緩衝區，斷開連接並標記為瞬時故障"""
+        device = device_factory(lambda request, count: [header])
+        adapter = EthernetAdapter("127.0.0.1", device.port)
+        assert adapter.connect()
+
+        result = adapter.send_command("X", {})
+        assert result["transient"] is True
+        assert not adapter.connected
+
+    def test_msgpack_reply_to_json_request(self, device_factory):
+        """響應按幀頭中的編碼標識解析"""
+        pytest.importorskip("msgpack")
+        device = device_factory(lambda request, count: [_frame({"v": 1.5}, MSGPACK_CODEC)])
+        adapter = EthernetAdapter("127.0.0.1", device.port)
+        assert adapter.connect()
+
+        assert adapter.send_command("X", {}) == {"v": 1.5}
+        adapter.disconnect()
+
+
+@pytest.fixture
+def unresponsive_port():
+    """積壓隊列已滿、從不accept的監聽端口，新的連接握手無法完成"""
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(0)
+    port = listener.getsockname()[1]
+
+    fillers = []
+    for _ in range(8):
+        filler = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        filler.setblocking(False)
+        filler.connect_ex(("127.0.0.1", port))
+        fillers.append(filler)
+    time.sleep(0.1)
+
+    yield port
+    for filler in fillers:
+        filler.close()
+    listener.close()
+
+
+class TestConnectDeadline:
+    """以太網連接時限測試"""
+
+    def test_connect_gives_up_at_deadline(self, unresponsive_port):
+        """握手無響應時在 connect_timeout 內放棄，而不是等待完整的收發超時"""
+        adapter = EthernetAdapter("127.0.0.1", unresponsive_port, timeout=5.0,
+                                  connect_timeout=0.2)
+        started = time.monotonic()
+        assert not adapter.connect()
+        elapsed = time.monotonic() - started
+
+        assert 0.15 < elapsed < 1.0
+        assert not adapter.connected
+
+    def test_refused_connection_fails_fast(self):
+        """端口未監聽時立即失敗"""
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(("127.0.0.1", 0))
+        port = listener.getsockname()[1]
+        listener.close()
+
+        adapter = EthernetAdapter("127.0.0.1", port, connect_timeout=2.0)
+        started = time.monotonic()
+        assert not adapter.connect()
+        assert time.monotonic() - started < 0.5
+
+    def test_socket_blocking_with_timeout_after_connect(self, device_factory):
+        """連接建立後恢復為帶收發超時的阻塞套接字"""
+        device = device_factory(_echo)
+        adapter = EthernetAdapter("127.0.0.1", device.port, timeout=0.7)
+        assert adapter.connect()
+        assert adapter.socket.gettimeout() == 0.7
+        assert adapter.send_command("X", {})["echo"] == "X"
+        adapter.disconnect()
+
+
+class TestTimestampSplicing:
+    """緩存的命令前綴與時間戳拼接測試"""
+
+    def _round_trip(self, device_factory, codec):
+        device = device_factory(_echo)
+        adapter = EthernetAdapter("127.0.0.1", device.port, codec=codec)
+        assert adapter.connect()
+
+        parameters = {"power": 1.5e-9, "mode": "連續", "enabled": True}
+        for timestamp_ns in (1, 2 ** 63 + 5, time.time_ns()):
+            adapter.send_request("SET", parameters, timestamp_ns)
+            assert adapter.receive_response()["echo"] == "SET"
+        # 不可哈希的參數不經過緩存
+        adapter.send_request("SET", {"values": [1, 2]}, 7)
+        adapter.receive_response()
+        adapter.disconnect()
+
+        assert device.requests[:3] == [
+            {"command": "SET", "parameters": parameters, "timestamp_ns": timestamp_ns}
+            for timestamp_ns in (1, 2 ** 63 + 5, device.requests[2]["timestamp_ns"])
+        ]
+        assert isinstance(device.requests[2]["timestamp_ns"], int)
+        assert device.requests[3] == {"command": "SET", "parameters": {"values": [1, 2]},
+                                      "timestamp_ns": 7}
+
+    def test_json_round_trip(self, device_factory):
+        """JSON編碼的時間戳拼接"""
+        self._round_trip(device_factory, "json")
+
+    def test_msgpack_round_trip(self, device_factory):
+        """msgpack編碼的時間戳拼接"""
+        pytest.importorskip("msgpack")
+        self._round_trip(device_factory, "msgpack")
+
+    def test_container_values_do_not_collide(self):
+        """元組內元素類型不同的參數不會命中同一條緩存"""
+        adapter = EthernetAdapter("127.0.0.1", 0)
+        ints = adapter._encode_command("SET", {"v": (1, 2)})
+        floats = adapter._encode_command("SET", {"v": (1.0, 2.0)})
+        assert ints != floats
+        assert b"1.0" in floats
+        assert not adapter._cmd_cache
+
+    def test_default_codec_is_json(self, device_factory):
+        """默認使用JSON發送，msgpack需顯式開啟"""
+        device = device_factory(_echo)
+        adapter = EthernetAdapter("127.0.0.1", device.port)
+        assert adapter.connect()
+        adapter.send_command("X", {})
+        adapter.disconnect()
+        assert device.requests == [{"command": "X", "parameters": {},
+                                    "timestamp_ns": device.requests[0]["timestamp_ns"]}]
+
+
+class TestDeviceManagerRecovery:
+    """設備管理器故障恢復測試"""
+
+    def test_reconnect_after_transient_failure(self, device_factory):
+        """重試用盡後設備斷開，下一次調用自動重連"""
+        def slow_first(request, count):
+            if count == 1:
+                return [0.5, _frame({"late": True})]
+            return _echo(request, count)
+
+        device = device_factory(slow_first)
+        manager = DeviceManager(max_attempts=1)
+        adapter = EthernetAdapter("127.0.0.1", device.port, timeout=0.2)
+        manager.register_device("laser", adapter, {})
+
+        result = manager.send_to_device("laser", "FIRST", {})
+        assert result["transient"] is True
+        assert not adapter.connected
+
+        # 遲到的響應不會被當作後續命令的結果
+        time.sleep(0.5)
+        assert manager.send_to_device("laser", "SECOND", {})["echo"] == "SECOND"
+        assert manager.get_system_status()["laser"]["status"]["echo"] == "read_status"
+
+    def test_retry_recovers_within_call(self, device_factory):
+        """瞬時故障在同一次調用內重試成功"""
+        def slow_first(request, count):
+            if count == 1:
+                return [0.5]
+            return _echo(request, count)
+
+        device = device_factory(slow_first)
+        manager = DeviceManager(max_attempts=3, retry_base=0.01)
+        adapter = EthernetAdapter("127.0.0.1", device.port, timeout=0.2)
+        manager.register_device("laser", adapter, {})
+
+        assert manager.send_to_device("laser", "CMD", {})["echo"] == "CMD"
+        assert manager.broadcast_command("ALL", {})["laser"]["echo"] == "ALL"
+
+    def test_broadcast_slow_device_does_not_delay_others(self, device_factory):
+        """逐段慢速響應的設備不影響同一次廣播中已響應的設備"""
+        def trickle(request, count):
+            # 每段間隔都小於單次接收超時，但整幀超過廣播截止時間
+            data = _frame({"echo": request["command"]})
+            return [data[:2], 0.6, data[2:4], 0.6, data[4:]]
+
+        def fast(request, count):
+            return [0.05] + _echo(request, count)
+
+        slow_device = device_factory(trickle)
+        fast_device = device_factory(fast)
+        manager = DeviceManager(max_attempts=1)
+        slow = EthernetAdapter("127.0.0.1", slow_device.port, timeout=1.0)
+        manager.register_device("slow", slow, {})
+        manager.register_device("fast", EthernetAdapter("127.0.0.1", fast_device.port, timeout=1.0), {})
+
+        started = time.monotonic()
+        results = manager.broadcast_command("ALL", {})
+        elapsed = time.monotonic() - started
+
+        assert results["fast"]["echo"] == "ALL"
+        # 健康的設備只執行一次命令
+        assert len(fast_device.requests) == 1
+        assert results["slow"]["transient"] is True
+        assert not slow.connected
+        assert elapsed < 1.15
+
+    def test_broadcast_timeout_result_is_structured(self, device_factory):
+        """廣播超時返回帶 transient 標記的結構化錯誤"""
+        device = device_factory(lambda request, count: [2.0])
+        manager = DeviceManager(max_attempts=1)
+        adapter = EthernetAdapter("127.0.0.1", device.port, timeout=0.2)
+        manager.register_device("laser", adapter, {})
+
+        result = manager.broadcast_command("X", {})["laser"]
+        assert result["error"] == "send_failed"
+        assert result["transient"] is True
+
+
+    def test_close_releases_pool_and_connections(self, device_factory):
+        """close() 關閉線程池並斷開全部設備"""
+        device = device_factory(_echo)
+        manager = DeviceManager()
+        adapter = EthernetAdapter("127.0.0.1", device.port)
+        manager.register_device("laser", adapter, {})
+        assert manager.broadcast_command("ALL", {})["laser"]["echo"] == "ALL"
+
+        manager.close()
+        assert not adapter.connected
+        with pytest.raises(RuntimeError):
+            manager._pool.submit(time.sleep, 0)
+
+
+class TestStatusCache:
+    """設備狀態緩存測試"""
+
+    def test_status_cached_within_ttl(self, device_factory):
+        """有效期內重複讀取不訪問設備，過期後重新讀取"""
+        device = device_factory(_echo)
+        manager = DeviceManager(status_ttl=0.3)
+        manager.register_device("laser", EthernetAdapter("127.0.0.1", device.port), {})
+
+        first = manager.get_system_status()["laser"]["status"]
+        assert manager.get_system_status()["laser"]["status"] == first
+        assert len(device.requests) == 1
+
+        time.sleep(0.4)
+        assert manager.get_system_status()["laser"]["status"]["count"] == 2
+        manager.close()
+
+    def test_timeout_not_cached(self, device_factory):
+        """讀取超時的設備不寫入緩存，下一次重新讀取"""
+        def slow_first(request, count):
+            if count == 1:
+                return [0.3] + _echo(request, count)
+            return _echo(request, count)
+
+        device = device_factory(slow_first)
+        manager = DeviceManager(call_timeout=0.1, status_ttl=10.0)
+        manager.register_device("laser", EthernetAdapter("127.0.0.1", device.port, timeout=1.0), {})
+
+        assert manager.get_system_status()["laser"]["status"]["transient"] is True
+        time.sleep(0.4)
+        assert manager.get_system_status()["laser"]["status"]["count"] == 2
+        manager.close()
+
+    def test_register_invalidates_entry(self, device_factory):
+        """重新註冊設備後不再使用舊設備的緩存"""
+        old = device_factory(lambda request, count: [_frame({"device": "old"})])
+        new = device_factory(lambda request, count: [_frame({"device": "new"})])
+        manager = DeviceManager(status_ttl=10.0)
+        manager.register_device("laser", EthernetAdapter("127.0.0.1", old.port), {})
+        assert manager.get_system_status()["laser"]["status"] == {"device": "old"}
+
+        manager.register_device("laser", EthernetAdapter("127.0.0.1", new.port), {})
+        assert manager.get_system_status()["laser"]["status"] == {"device": "new"}
+        manager.close()
+
+
+class TestAsyncDeviceManager:
+    """異步設備管理器測試"""
+
+    def test_broadcast_shares_timestamp_and_retries(self, device_factory):
+        """廣播共用一個時間戳，瞬時故障的設備重連後重試成功"""
+        def slow_first(request, count):
+            if count == 1:
+                return [0.5]
+            return _echo(request, count)
+
+        flaky = device_factory(slow_first)
+        steady = device_factory(_echo)
+
+        async def scenario():
+            manager = AsyncDeviceManager(max_attempts=3, retry_base=0.01)
+            await manager.register_device(
+                "flaky", AsyncEthernetAdapter("127.0.0.1", flaky.port, timeout=0.2), {})
+            await manager.register_device(
+                "steady", AsyncEthernetAdapter("127.0.0.1", steady.port), {})
+            results = await manager.broadcast_command("ALL", {})
+            await manager.disconnect_all()
+            return results
+
+        results = asyncio.run(scenario())
+        assert results["flaky"]["echo"] == "ALL"
+        assert results["steady"]["echo"] == "ALL"
+        assert flaky.requests[0]["timestamp_ns"] == steady.requests[0]["timestamp_ns"]
+
+    def test_status_cached_within_ttl(self, device_factory):
+        """有效期內重複讀取狀態不訪問設備"""
+        device = device_factory(_echo)
+
+        async def scenario():
+            manager = AsyncDeviceManager(status_ttl=0.3)
+            await manager.register_device(
+                "laser", AsyncEthernetAdapter("127.0.0.1", device.port), {})
+            first = await manager.get_system_status()
+            second = await manager.get_system_status()
+            await asyncio.sleep(0.4)
+            third = await manager.get_system_status()
+            await manager.disconnect_all()
+            return first, second, third
+
+        first, second, third = asyncio.run(scenario())
+        assert first["laser"]["status"] == second["laser"]["status"]
+        assert third["laser"]["status"]["count"] == 2
+        assert len(device.requests) == 2
+
+    def test_cancelled_request_disconnects(self, device_factory):
+        """請求被取消後斷開連接，遲到的響應不會被下一條命令讀到"""
+        def slow_first(request, count):
+            if count == 1:
+                return [0.3, _frame({"late": True})]
+            return _echo(request, count)
+
+        device = device_factory(slow_first)
+
+        async def scenario():
+            adapter = AsyncEthernetAdapter("127.0.0.1", device.port)
+            assert await adapter.connect()
+            task = asyncio.create_task(adapter.send_command("FIRST", {}))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            assert not adapter.connected
+
+            await asyncio.sleep(0.3)
+            assert await adapter.connect()
+            result = await adapter.send_command("SECOND", {})
+            await adapter.disconnect()
+            return result
+
+        assert asyncio.run(scenario())["echo"] == "SECOND"
+
+
+class _Registers:
+    def __init__(self, registers):
+        self.registers = registers
+
+    def isError(self):
+        return False
+
+
+class FakeModbusClient:
+    """pymodbus 3.10+ 風格的客戶端 (從站地址參數為 device_id)"""
+
+    instances = []
+
+    def __init__(self, host, port=502, timeout=3.0):
+        self.calls = []
+        FakeModbusClient.instances.append(self)
+
+    def connect(self):
+        return True
+
+    def close(self):
+        pass
+
+    def read_holding_registers(self, address, *, count=1, device_id=1):
+        self.calls.append(("read", address, count, device_id))
+        return _Registers([2200, 150, 255][:count])
+
+    def write_registers(self, address, values, *, device_id=1):
+        self.calls.append(("write", address, values, device_id))
+        return _Registers([])
+
+
+class LegacyModbusClient(FakeModbusClient):
+    """pymodbus 3.10 之前的客戶端 (從站地址參數為 slave)"""
+
+    def read_holding_registers(self, address, count=1, slave=0, **kwargs):
+        self.calls.append(("read", address, count, slave))
+        return _Registers([2200, 150, 255][:count])
+
+
+class TestModbusTCPAdapter:
+    """Modbus適配器測試 (模擬pymodbus客戶端)"""
+
+    @pytest.fixture(params=[FakeModbusClient, LegacyModbusClient])
+    def client_class(self, request, monkeypatch):
+        monkeypatch.setattr(device_adapters, "ModbusTcpClient", request.param)
+        FakeModbusClient.instances.clear()
+        return request.param
+
+    def test_status_read_in_one_request(self, client_class):
+        """狀態寄存器一次讀取並按佈局換算"""
+        adapter = ModbusTCPAdapter("127.0.0.1", unit=7)
+        assert adapter.connect()
+
+        assert adapter.read_status() == pytest.approx(
+            {"voltage": 220.0, "current": 1.5, "temperature": 25.5})
+        assert FakeModbusClient.instances[0].calls == [("read", 0, 3, 7)]
+
+    def test_invalid_parameters(self, client_class):
+        """參數缺失或寄存器數量越界"""
+        adapter = ModbusTCPAdapter("127.0.0.1")
+        assert adapter.connect()
+
+        assert "error" in adapter.send_command("read_registers", {"address": 0})
+        assert "error" in adapter.send_command("read_registers", {"address": 0, "count": 200})
+        assert FakeModbusClient.instances[0].calls == []
+
+    def test_programming_errors_are_not_reported_as_device_errors(self, monkeypatch):
+        """客戶端調用方式錯誤時直接拋出，而不是偽裝成設備故障"""
+        class BrokenClient(FakeModbusClient):
+            def read_holding_registers(self, address, *, count=1, other=1):
+                raise AssertionError("unreachable")
+
+        monkeypatch.setattr(device_adapters, "ModbusTcpClient", BrokenClient)
+        monkeypatch.setattr(device_adapters, "_modbus_unit_keyword", lambda client_class: "device_id")
+        adapter = ModbusTCPAdapter("127.0.0.1")
+        assert adapter.connect()
+        with pytest.raises(TypeError):
+            adapter.read_status()
+
+    def test_without_pymodbus(self, monkeypatch):
+        """未安裝pymodbus時無法連接"""
+        monkeypatch.setattr(device_adapters, "ModbusTcpClient", None)
+        adapter = ModbusTCPAdapter("127.0.0.1")
+        assert not adapter.connect()
+        assert adapter.read_status() == {"error": "設備未連接"}
+
+
+class FakeSerialPort:
+    """模擬串口: 每次 read 依次返回預設的數據塊，耗盡後返回空 (相當於讀超時)"""
+
+    def __init__(self, port=None, baudrate=9600, timeout=1.0):
+        self.chunks = []
+        self.written = []
+        self.is_open = True
+        self.resets = 0
+        self.reads = 0
+
+    @property
+    def in_waiting(self):
+        return len(self.chunks[0]) if self.chunks else 0
+
+    def read(self, size=1):
+        self.reads += 1
+        if not self.chunks:
+            return b""
+        chunk = self.chunks.pop(0)
+        if len(chunk) > size:
+            self.chunks.insert(0, chunk[size:])
+            chunk = chunk[:size]
+        return chunk
+
+    def write(self, data):
+        self.written.append(data)
+
+    def reset_input_buffer(self):
+        self.resets += 1
+        self.chunks.clear()
+
+    def close(self):
+        self.is_open = False
+
+
+@pytest.fixture
+def serial_adapter(monkeypatch):
+    monkeypatch.setattr(device_adapters.serial, "Serial", FakeSerialPort)
+    adapter = SerialAdapter("/dev/ttyFAKE")
+    assert adapter.connect()
+    return adapter
+
+
+class TestSerialAdapter:
+    """串口適配器測試"""
+
+    def test_silent_device_is_transient_timeout(self, serial_adapter):
+        """設備無響應時返回瞬時超時，可被重試"""
+        result = serial_adapter.read_status()
+        assert result["transient"] is True
+        assert "TimeoutError" in result["exception"]
+
+    def test_partial_line_is_discarded(self, serial_adapter):
+        """超時時收到的半行被丟棄，不會與下一條響應拼接"""
+        port = serial_adapter.serial
+        port.chunks = [b'{"v": ']
+        result = serial_adapter.send_command("GET", {})
+        assert result["transient"] is True
+        assert port.resets == 1
+
+        port.chunks = [b'{"v": 2}\r\n']
+        assert serial_adapter.send_command("GET", {}) == {"v": 2}
+
+
+class TestSerialLineReader:
+    """串口按行讀取測試"""
+
+    def test_reads_available_bytes_in_one_call(self):
+        """已到達的數據一次讀完，不逐字節讀取"""
+        port = FakeSerialPort()
+        port.chunks = [b'{"v": 1, "pad": "' + b"x" * 200 + b'"}\r\n']
+        reader = device_adapters._SerialLineReader(port)
+        assert reader.readline().endswith(b"\r\n")
+        assert port.reads == 1
+
+    def test_line_split_across_reads(self):
+        """一行分多次到達時拼接完整"""
+        port = FakeSerialPort()
+        port.chunks = [b'{"v"', b": 1", b"}\r", b"\n"]
+        reader = device_adapters._SerialLineReader(port)
+        assert reader.readline() == b'{"v": 1}\r\n'
+
+    def test_extra_lines_kept_for_next_read(self):
+        """同一塊中的後續行保留給下一次讀取"""
+        port = FakeSerialPort()
+        port.chunks = [b"first\r\nsecond\r\nthi", b"rd\r\n"]
+        reader = device_adapters._SerialLineReader(port)
+        assert reader.readline() == b"first\r\n"
+        assert reader.readline() == b"second\r\n"
+        assert reader.readline() == b"third\r\n"
+        assert port.reads == 2
+
+    def test_timeout_returns_partial_line(self):
+        """超時時返回已收到的半行，緩衝區清空"""
+        port = FakeSerialPort()
+        port.chunks = [b"par"]
+        reader = device_adapters._SerialLineReader(port)
+        assert reader.readline() == b"par"
+        assert reader.readline() == b""
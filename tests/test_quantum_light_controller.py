@@ -0,0 +1,216 @@
+import asyncio
+import dataclasses
+import time
+
+import pytest
+from examples import quantum_light_controller as qlc
+from examples.quantum_light_controller import (
+    EmissionParameters, EventKind, LightSourceConfig, LightSourceState,
+    QuantumLightSourceController
+)
+
+
+class TestEmissionParameters:
+    """發射參數驗證測試"""
+
+    @pytest.mark.parametrize("kwargs", [
+        {"power": 0},
+        {"power": 1e-9, "duration": -1},
+        {"power": 1e-9, "frequency": -1},
+        {"power": 1e-9, "duty_cycle": 0},
+        {"power": 1e-9, "duty_cycle": 1.5},
+    ])
+    def test_invalid_rejected_at_construction(self, kwargs):
+        with pytest.raises(ValueError):
+            EmissionParameters(**kwargs)
+
+    def test_cannot_bypass_validation(self):
+        """構造後不能再修改字段繞過驗證"""
+        params = EmissionParameters(power=1e-9)
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            params.power = -1.0
+        assert params.power == 1e-9
+
+
+@pytest.fixture
+def trace(monkeypatch):
+    """縮短預熱時間，並記錄子系統啟動/關閉的先後順序"""
+    events = []
+
+    def initialize(self):
+        events.append("initialize")
+        time.sleep(0.3)
+        events.append("initialized")
+
+    def shutdown(self):
+        events.append("shutdown")
+
+    monkeypatch.setattr(qlc, "WARMUP_STEPS", ((0.1, 0.05), (0.5, 0.05)))
+    monkeypatch.setattr(qlc.QuantumJetSubsystem, "initialize", initialize)
+    monkeypatch.setattr(qlc.QuantumJetSubsystem, "shutdown", shutdown)
+    monkeypatch.setattr(qlc.ShenquOptimizerSubsystem, "warm_up", lambda self: None)
+    return events
+
+
+@pytest.fixture
+def transitions():
+    return []
+
+
+@pytest.fixture
+def controller(transitions):
+    controller = QuantumLightSourceController(LightSourceConfig())
+    controller.register_callback(
+        EventKind.STATE_CHANGE,
+        lambda data: transitions.append((data["old_state"], data["new_state"])))
+    return controller
+
+
+class TestPowerSequence:
+    """開機/關機流程測試"""
+
+    def test_power_on_completes(self, trace, controller):
+        """正常開機進入 READY"""
+        assert asyncio.run(controller.power_on())
+        assert controller.state == LightSourceState.READY
+
+    def test_cancel_warmup_returns_to_off(self, trace, controller):
+        """初始化期間中止開機，子系統關閉後回到 OFF，並可再次開機"""
+        async def scenario():
+            task = asyncio.create_task(controller.power_on())
+            await asyncio.sleep(0.1)
+            controller.cancel_warmup()
+            assert await task is False
+            assert controller.state == LightSourceState.OFF
+            return await controller.power_on()
+
+        assert asyncio.run(scenario())
+        # 關閉發生在初始化完成之後
+        assert trace[:3] == ["initialize", "initialized", "shutdown"]
+        assert controller.state == LightSourceState.READY
+
+    def test_power_off_during_power_on(self, trace, controller, transitions):
+        """開機過程中關機: 等待初始化結束後只關閉一次，沒有多餘的狀態事件"""
+        async def scenario():
+            task = asyncio.create_task(controller.power_on())
+            await asyncio.sleep(0.1)
+            await controller.power_off()
+            assert controller.state == LightSourceState.OFF
+            assert await task is False
+            await asyncio.sleep(0)
+
+        asyncio.run(scenario())
+        assert trace == ["initialize", "initialized", "shutdown"]
+        assert transitions == [
+            (LightSourceState.OFF, LightSourceState.STANDBY),
+            (LightSourceState.STANDBY, LightSourceState.OFF),
+        ]
+
+    def test_second_power_on_not_disturbed(self, trace, controller):
+        """中止後立即重新開機，前一次開機的收尾不影響新的開機"""
+        async def scenario():
+            first = asyncio.create_task(controller.power_on())
+            await asyncio.sleep(0.1)
+            await controller.power_off()
+            second = await controller.power_on()
+            return await first, second
+
+        assert asyncio.run(scenario()) == (False, True)
+        assert controller.state == LightSourceState.READY
+        assert trace.count("shutdown") == 1
+
+    def test_power_on_cancelled(self, trace, controller):
+        """power_on 本身被取消時同樣回到 OFF"""
+        async def scenario():
+            task = asyncio.create_task(controller.power_on())
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(scenario())
+        assert controller.state == LightSourceState.OFF
+        assert trace == ["initialize", "initialized", "shutdown"]
+
+    def test_power_off_when_off_is_noop(self, trace, controller, transitions):
+        """已關閉時再次關機不重複關閉子系統"""
+        asyncio.run(controller.power_off())
+        assert trace == []
+        assert transitions == []
+
+
+class TestSetPower:
+    """功率調整快速路徑測試"""
+
+    def test_ramp_dispatches_when_drift_exceeds_tolerance(self, controller, monkeypatch):
+        """50步小幅爬升: 每步都在容差內，但累計偏離超出容差時仍會下發，即每兩步下發一次"""
+        dispatched = []
+        monkeypatch.setattr(qlc.ShenquOptimizerSubsystem, "adjust_power",
+                            lambda self, power: dispatched.append(power) or True)
+        updates = []
+        controller.register_callback(EventKind.POWER_UPDATE, updates.append)
+
+        tolerance = controller.config.stability_target * controller.config.max_power
+        controller.state = LightSourceState.EMITTING
+        controller.current_power = controller._dispatched_power = start = 1e-9
+        targets = [start + 0.6 * tolerance * step for step in range(1, 51)]
+        for power in targets:
+            assert controller.set_power(power)
+
+        assert dispatched == targets[1::2]
+        assert updates == dispatched
+        assert controller.current_power == targets[-1]
+
+    def test_small_change_skips_optimizer(self, controller, monkeypatch):
+        """容差內的調整只更新當前功率"""
+        dispatched = []
+        monkeypatch.setattr(qlc.ShenquOptimizerSubsystem, "adjust_power",
+                            lambda self, power: dispatched.append(power) or True)
+        controller.state = LightSourceState.EMITTING
+        controller.current_power = controller._dispatched_power = 1e-9
+
+        assert controller.set_power(1.01e-9)
+        assert dispatched == []
+        assert controller.current_power == 1.01e-9
+
+
+class TestCallbackDispatch:
+    """回調事件隊列派發測試"""
+
+    def test_dispatched_in_place_outside_loop(self, controller):
+        """不在事件循環中時就地派發"""
+        updates = []
+        controller.register_callback("power_update", updates.append)
+        controller._trigger_callbacks(EventKind.POWER_UPDATE, 1.0)
+        assert updates == [1.0]
+
+    def test_batched_on_loop_in_order(self, controller):
+        """事件循環中的多個事件合併為一次派發，並保持觸發順序"""
+        updates = []
+        controller.register_callback(EventKind.POWER_UPDATE, updates.append)
+
+        async def scenario():
+            for power in (1.0, 2.0, 3.0):
+                controller._trigger_callbacks(EventKind.POWER_UPDATE, power)
+            assert updates == []
+            await asyncio.sleep(0)
+            return list(updates)
+
+        assert asyncio.run(scenario()) == [1.0, 2.0, 3.0]
+
+    def test_failing_callback_does_not_block_others(self, controller):
+        """單個回調拋出異常不影響其他回調和後續事件"""
+        def broken(data):
+            raise RuntimeError("boom")
+
+        updates = []
+        controller.register_callback(EventKind.POWER_UPDATE, broken)
+        controller.register_callback(EventKind.POWER_UPDATE, updates.append)
+        controller._trigger_callbacks(EventKind.POWER_UPDATE, 1.0)
+        controller._trigger_callbacks(EventKind.POWER_UPDATE, 2.0)
+        assert updates == [1.0, 2.0]
+
+    def test_no_subscribers_not_queued(self, controller):
+        """無訂閱者的事件不進入隊列"""
+        controller._trigger_callbacks(EventKind.ERROR, {"error": "x"})
+        assert not controller._event_queue